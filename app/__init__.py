@@ -3,6 +3,10 @@ from flask_cors import CORS
 
 def create_app():
     app = Flask(__name__)
+
+    # Pool workers are spawned and re-import run.py; only the main process runs the start-up side effects
+    from app.pipeline.stage_pool import is_main_process
+    main_process = is_main_process()
     
     # Enable CORS
     CORS(app, resources={r"*": {"origins": "*"}})
@@ -10,8 +14,22 @@ def create_app():
     # Load configuration
     app.config.from_object('app.config.Config')
 
+    # Fast JSON encoding and negotiated gzip/brotli/zstd compression for large payloads
+    from app.utils.json_provider import init_json_provider
+    from app.utils.compression import init_compression
+    init_json_provider(app)
+    init_compression(app)
+
+    # Declared MongoDB indexes: checked at startup and available as `flask ensure-indexes`
+    from app.services.indexes import init_indexes
+    init_indexes(app, ensure=main_process)
+
    # Register blueprints
     from app.routes import main_routes
     app.register_blueprint(main_routes)
 
+    # Load pex-forecaster in its worker processes in the background, not in the web process
+    from app.pipeline.run_pex import warm_forecaster_pool
+    warm_forecaster_pool()
+
     return app
\ No newline at end of file
@@ -6,6 +6,11 @@ from dotenv import load_dotenv
 # Load environment variables from .env file into os.environ
 load_dotenv()
 
+def _optional_int(name):
+    """Read an integer environment variable, returning None when it is unset."""
+    value = os.environ.get(name)
+    return int(value) if value else None
+
 class Config:
     REPOSITORIES = [
         "https://github.com/apache/curator.git",
@@ -17,9 +22,68 @@ class Config:
     
     DATA_DIR = os.path.join(os.getcwd(), 'out', 'apache', 'github')
     
-    MONGODB_DB_NAME = 'decal-db'
+    MONGODB_DB_NAME = os.environ.get('MONGO_DB_NAME', 'decal-db')
     MONGODB_URI = os.environ.get('MONGODB_URI')
 
+    # Connection pool of the single MongoClient shared by the routes, services and pipeline (see app/database.py)
+    MONGODB_MAX_POOL_SIZE = int(os.environ.get('MONGODB_MAX_POOL_SIZE', 50))
+    MONGODB_MIN_POOL_SIZE = int(os.environ.get('MONGODB_MIN_POOL_SIZE', 0))
+    MONGODB_MAX_IDLE_TIME_MS = _optional_int('MONGODB_MAX_IDLE_TIME_MS')
+    MONGODB_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGODB_CONNECT_TIMEOUT_MS', 5000))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 10000))
+    MONGODB_SOCKET_TIMEOUT_MS = _optional_int('MONGODB_SOCKET_TIMEOUT_MS')
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS = _optional_int('MONGODB_WAIT_QUEUE_TIMEOUT_MS')
+    MONGODB_READ_PREFERENCE = os.environ.get('MONGODB_READ_PREFERENCE', 'primary')
+
+    # Create the declared indexes (app/services/indexes.py) at startup; in strict mode the app refuses
+    # to start when one of them is missing and cannot be built
+    MONGODB_ENSURE_INDEXES = os.environ.get('MONGODB_ENSURE_INDEXES', 'true').lower() == 'true'
+    MONGODB_INDEXES_STRICT = os.environ.get('MONGODB_INDEXES_STRICT', 'false').lower() == 'true'
+
+    # Local-mode pipeline jobs (/api/upload_git_link): how many run at once in each web process, how many may be
+    # queued or running before new submissions are refused, and after how long without progress a job is abandoned
+    PIPELINE_MAX_CONCURRENCY = int(os.environ.get('PIPELINE_MAX_CONCURRENCY', 1))
+    PIPELINE_MAX_PENDING_JOBS = int(os.environ.get('PIPELINE_MAX_PENDING_JOBS', 20))
+    PIPELINE_JOB_STALE_SECONDS = int(os.environ.get('PIPELINE_JOB_STALE_SECONDS', 6 * 3600))
+
+    # Pipeline results are cached per (project, repository HEAD); entries expire after PIPELINE_RESULT_TTL_SECONDS
+    # and at most PIPELINE_RESULT_CACHE_MAX_ENTRIES are kept. HEAD is read from a mirror under PIPELINE_MIRROR_DIR
+    # (<project>.git or <project>) when there is one, otherwise with `git ls-remote`.
+    PIPELINE_RESULT_TTL_SECONDS = int(os.environ.get('PIPELINE_RESULT_TTL_SECONDS', 7 * 24 * 3600))
+    PIPELINE_RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('PIPELINE_RESULT_CACHE_MAX_ENTRIES', 500))
+    PIPELINE_MIRROR_DIR = os.environ.get('PIPELINE_MIRROR_DIR')
+    PIPELINE_HEAD_TIMEOUT_SECONDS = int(os.environ.get('PIPELINE_HEAD_TIMEOUT_SECONDS', 30))
+
+    # Every pipeline run mines into its own directory under PIPELINE_WORKSPACE_ROOT/<project_id>/runs/<run_id>;
+    # finished run directories are removed after PIPELINE_WORKSPACE_RETENTION_SECONDS, and beyond the newest
+    # PIPELINE_WORKSPACE_MAX_RUNS; unfinished ones only once nothing in them changed for PIPELINE_WORKSPACE_STALE_SECONDS
+    PIPELINE_WORKSPACE_ROOT = os.environ.get('PIPELINE_WORKSPACE_ROOT', os.path.join(os.getcwd(), 'out', 'local'))
+    PIPELINE_WORKSPACE_RETENTION_SECONDS = int(os.environ.get('PIPELINE_WORKSPACE_RETENTION_SECONDS', 3 * 24 * 3600))
+    PIPELINE_WORKSPACE_MAX_RUNS = int(os.environ.get('PIPELINE_WORKSPACE_MAX_RUNS', 50))
+    PIPELINE_WORKSPACE_STALE_SECONDS = int(os.environ.get('PIPELINE_WORKSPACE_STALE_SECONDS', 14 * 24 * 3600))
+
+    # In-process cache for the per-project, per-month read endpoints
+    MONTH_CACHE_MAX_ENTRIES = int(os.environ.get('MONTH_CACHE_MAX_ENTRIES', 2048))
+    MONTH_CACHE_TTL_SECONDS = int(os.environ.get('MONTH_CACHE_TTL_SECONDS', 600))
+    # How often each web process checks for projects rewritten by the workers or the pipeline
+    CACHE_INVALIDATION_POLL_SECONDS = float(os.environ.get('CACHE_INVALIDATION_POLL_SECONDS', 5))
+
+    # Largest number of months a single /api/<network>/<project_id>?from=&to= request may ask for
+    MAX_MONTH_RANGE = int(os.environ.get('MAX_MONTH_RANGE', 600))
+
+    # The listing endpoints are served from in-memory snapshots, rebuilt when their collection is rewritten
+    # and, as a safety net, after this many seconds
+    LISTING_SNAPSHOT_MAX_AGE_SECONDS = int(os.environ.get('LISTING_SNAPSHOT_MAX_AGE_SECONDS', 3600))
+
+    # JSON encoder used by jsonify: 'orjson' (falls back to 'default' if orjson is not installed)
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson')
+
+    # Negotiated response compression; responses smaller than COMPRESSION_MIN_SIZE bytes are sent as-is
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_ALGORITHMS = os.environ.get('COMPRESSION_ALGORITHMS', 'zstd,br,gzip')
+    COMPRESSION_LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+
     # Automatically collect all GITHUB_TOKEN_* variables and put them into a list
     @staticmethod
     def collect_github_tokens():
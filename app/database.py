@@ -0,0 +1,147 @@
+import os
+import logging
+import threading
+from pymongo import MongoClient, monitoring
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool events so the pool's behaviour can be inspected from the API."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {
+            'pools_created': 0,
+            'pools_cleared': 0,
+            'connections_created': 0,
+            'connections_closed': 0,
+            'checkouts': 0,
+            'checkout_failures': 0,
+            'checkins': 0,
+        }
+
+    def _incr(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def pool_created(self, event):
+        self._incr('pools_created')
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr('pools_cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr('connections_created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr('connections_closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr('checkout_failures')
+
+    def connection_checked_out(self, event):
+        self._incr('checkouts')
+
+    def connection_checked_in(self, event):
+        self._incr('checkins')
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats['connections_open'] = stats['connections_created'] - stats['connections_closed']
+        stats['connections_in_use'] = stats['checkouts'] - stats['checkins']
+        return stats
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+_pool_listener = PoolStatsListener()
+
+
+def get_client():
+    """
+    Return the process-wide MongoClient, creating it on first use.
+    A new client is created after a fork, since MongoClient instances must not be shared across processes.
+    """
+    global _client, _client_pid, _pool_listener
+
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            if _client is not None:
+                # Inherited from the parent process; start with fresh counters as well
+                _pool_listener = PoolStatsListener()
+            _client = MongoClient(
+                Config.MONGODB_URI,
+                maxPoolSize=Config.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=Config.MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=Config.MONGODB_MAX_IDLE_TIME_MS,
+                connectTimeoutMS=Config.MONGODB_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=Config.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                socketTimeoutMS=Config.MONGODB_SOCKET_TIMEOUT_MS,
+                waitQueueTimeoutMS=Config.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+                readPreference=Config.MONGODB_READ_PREFERENCE,
+                event_listeners=[_pool_listener],
+            )
+            _client_pid = os.getpid()
+            logger.info(f"Created MongoDB client (maxPoolSize={Config.MONGODB_MAX_POOL_SIZE}, "
+                        f"readPreference={Config.MONGODB_READ_PREFERENCE}).")
+    return _client
+
+
+def get_db():
+    """Return the application database from the shared client."""
+    return get_client()[Config.MONGODB_DB_NAME]
+
+
+class LazyDatabase:
+    """
+    Stand-in for a pymongo Database that resolves the shared client on first use,
+    so modules can keep a module-level `db` without connecting at import time.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
+
+    def __getitem__(self, name):
+        return get_db()[name]
+
+
+db = LazyDatabase()
+
+
+def pool_stats():
+    """Connection pool settings and event counters for this process."""
+    return {
+        'pid': os.getpid(),
+        'client_created': _client is not None and _client_pid == os.getpid(),
+        'max_pool_size': Config.MONGODB_MAX_POOL_SIZE,
+        'min_pool_size': Config.MONGODB_MIN_POOL_SIZE,
+        'read_preference': Config.MONGODB_READ_PREFERENCE,
+        **_pool_listener.snapshot(),
+    }
+
+
+def close_client():
+    """Close the shared client (e.g. at worker shutdown); the next get_client() creates a new one."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
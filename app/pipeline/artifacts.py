@@ -0,0 +1,80 @@
+import os
+import glob
+import hashlib
+import logging
+from datetime import datetime
+from app.database import db
+
+# One document per project: {"project_id", "artifacts": {kind: {"path", "sha1", "size", "modified_at", "recorded_at"}}}
+# Kinds: the archived miner CSVs (commit_csv, issue_csv, tech_csv, social_csv) and pex-forecaster's
+# outputs for the project (net_cache, net_vis, forecasts)
+ARTIFACTS_COLLECTION = "pipeline_artifacts"
+
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def describe_artifact(path):
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "sha1": _file_sha1(path), "size": stat.st_size,
+            "modified_at": datetime.utcfromtimestamp(stat.st_mtime), "recorded_at": datetime.utcnow()}
+
+
+def record_artifacts(project_id, paths):
+    """Record the files of a project ({kind: path}; missing paths are ignored) in the artifact index."""
+    fields = {}
+    for kind, path in paths.items():
+        if path and os.path.exists(path):
+            fields[f"artifacts.{kind}"] = describe_artifact(path)
+    if not fields:
+        return
+    db[ARTIFACTS_COLLECTION].update_one({"project_id": project_id}, {"$set": fields}, upsert=True)
+    logging.info(f"Recorded artifacts {sorted(paths)} for '{project_id}'.")
+
+
+def get_artifacts(project_id):
+    """Return {kind: entry} of every recorded artifact of a project."""
+    doc = db[ARTIFACTS_COLLECTION].find_one({"project_id": project_id}, {"_id": 0, "artifacts": 1})
+    return (doc or {}).get("artifacts", {})
+
+
+def artifact_path(project_id, kind):
+    """The recorded path of one artifact of a project, or None if it was never recorded or has been removed."""
+    entry = get_artifacts(project_id).get(kind)
+    if entry and os.path.exists(entry["path"]):
+        return entry["path"]
+    return None
+
+
+def find_forecaster_outputs(pex_generator_dir, project_name):
+    """
+    Locate the outputs of a forecast run before the artifact index existed: net-vis/<project_name>.json,
+    forecasts/<project_name>.json and the net-caches CSV named after the project; returns {kind: path or None}.
+    """
+    outputs = {}
+    for kind, folder in (("net_vis", "net-vis"), ("forecasts", "forecasts")):
+        path = os.path.join(pex_generator_dir, folder, f"{project_name}.json")
+        outputs[kind] = path if os.path.exists(path) else None
+
+    named = []
+    for extension in ("", "-*", "_*"):
+        named += glob.glob(os.path.join(pex_generator_dir, "net-caches", f"{glob.escape(project_name)}{extension}.csv"))
+    outputs["net_cache"] = max(named, key=os.path.getmtime) if named else None
+    return outputs
+
+
+def migrate_forecaster_outputs(project_id, pex_generator_dir, project_name):
+    """
+    Record the outputs of a project forecast before the artifact index existed (see find_forecaster_outputs).
+    Runs once per project; later forecasts record the files they write themselves.
+    """
+    if db[ARTIFACTS_COLLECTION].count_documents({"project_id": project_id, "legacy_outputs_checked": True}, limit=1):
+        return
+    record_artifacts(project_id, find_forecaster_outputs(pex_generator_dir, project_name))
+    db[ARTIFACTS_COLLECTION].update_one({"project_id": project_id}, {"$set": {"legacy_outputs_checked": True}},
+                                        upsert=True)
@@ -0,0 +1,158 @@
+import os
+import json
+import glob
+import shutil
+import hashlib
+import logging
+import subprocess
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Forecast results are stored as <key>.json files, with copies of the files the forecast wrote in <key>/;
+# a .json file's mtime is its last use (for LRU eviction)
+FORECAST_CACHE_DIR = os.getenv("FORECAST_CACHE_DIR") or os.path.join("out", "forecast_cache")
+FORECAST_CACHE_MAX_ENTRIES = int(os.getenv("FORECAST_CACHE_MAX_ENTRIES") or 200)
+# Overrides the pex-forecaster commit as the version part of the key (e.g. when PEX_GENERATOR_DIR is no git checkout)
+FORECASTER_VERSION = os.getenv("FORECASTER_VERSION")
+
+_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+_lock = threading.Lock()
+
+
+def forecaster_version():
+    """The commit of the pex-forecaster checkout, so that updating it (update_pex) invalidates old forecasts."""
+    if FORECASTER_VERSION:
+        return FORECASTER_VERSION
+    try:
+        return subprocess.run(["git", "-C", os.getenv("PEX_GENERATOR_DIR") or ".", "rev-parse", "HEAD"],
+                              capture_output=True, text=True, check=True, timeout=10).stdout.strip()
+    except Exception as e:
+        logging.warning(f"Could not read the pex-forecaster version: {e}")
+        return "unknown"
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def forecast_key(tech_csv, social_csv, project, tasks, month_range, version=None):
+    """Hash of everything a forecast depends on: the bytes of both CSVs, the request and the forecaster version."""
+    parts = [_file_digest(tech_csv), _file_digest(social_csv), project, tasks, month_range,
+             version or forecaster_version()]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def _path(key):
+    return os.path.join(os.path.abspath(FORECAST_CACHE_DIR), f"{key}.json")
+
+
+def _outputs_dir(key):
+    return os.path.join(os.path.abspath(FORECAST_CACHE_DIR), key)
+
+
+def _copy_atomically(source, destination):
+    tmp_path = f"{destination}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+def _remove_entry(key):
+    for remove, path in ((os.remove, _path(key)), (shutil.rmtree, _outputs_dir(key))):
+        try:
+            remove(path)
+        except OSError:
+            pass
+
+
+def get_forecast(key):
+    """
+    Return the cached forecast stored under key ({"forecast", "outputs": {kind: path}, "archived": {kind: copy}}),
+    or None.
+    The entry is a miss when a copy of its output files is gone; see restore_outputs.
+    """
+    path = _path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        complete = all(os.path.exists(os.path.join(_outputs_dir(key), output["archived"]))
+                       for output in entry["outputs"].values())
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        complete = False
+    if not complete:
+        with _lock:
+            _stats["misses"] += 1
+        return None
+    os.utime(path)
+    with _lock:
+        _stats["hits"] += 1
+    return {"forecast": entry["forecast"], "outputs": {kind: output["path"] for kind, output in entry["outputs"].items()},
+            "archived": {kind: os.path.join(_outputs_dir(key), output["archived"])
+                         for kind, output in entry["outputs"].items()}}
+
+
+def restore_outputs(cached):
+    """
+    Copy the files of a cached forecast (from get_forecast) back to where the forecaster wrote them,
+    so the later stages read this forecast's outputs and not whatever another run left there.
+    """
+    for kind, path in cached["outputs"].items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _copy_atomically(cached["archived"][kind], path)
+
+
+def store_forecast(key, result):
+    """
+    Store a forecast ({"forecast", "outputs": {kind: path or None}}) under key, with copies of its output
+    files, and evict the least recently used entries.
+    """
+    path = _path(key)
+    try:
+        outputs = {}
+        _remove_entry(key)
+        os.makedirs(_outputs_dir(key), exist_ok=True)
+        for kind, output_path in (result.get("outputs") or {}).items():
+            if not output_path:
+                continue
+            archived = f"{kind}{os.path.splitext(output_path)[1]}"
+            shutil.copy2(output_path, os.path.join(_outputs_dir(key), archived))
+            outputs[kind] = {"path": output_path, "archived": archived}
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"forecast": result.get("forecast"), "outputs": outputs}, f, default=str)
+        os.replace(tmp_path, path)
+        with _lock:
+            _stats["stores"] += 1
+        evict_forecasts()
+    except Exception as e:
+        logging.error(f"Error storing forecast {key}: {e}")
+
+
+def evict_forecasts(max_entries=None):
+    """Keep at most FORECAST_CACHE_MAX_ENTRIES forecasts, removing the least recently used first."""
+    max_entries = FORECAST_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    entries = []
+    for path in glob.glob(os.path.join(os.path.abspath(FORECAST_CACHE_DIR), "*.json")):
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    excess = len(entries) - max_entries
+    if excess <= 0:
+        return 0
+    for _, path in sorted(entries)[:excess]:
+        _remove_entry(os.path.basename(path)[:-len(".json")])
+    with _lock:
+        _stats["evictions"] += excess
+    logging.info(f"Evicted {excess} cached forecasts.")
+    return excess
+
+
+def forecast_cache_stats():
+    with _lock:
+        return dict(_stats)
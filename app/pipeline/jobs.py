@@ -0,0 +1,207 @@
+import logging
+import threading
+import uuid
+from datetime import datetime
+from pymongo.errors import DocumentTooLarge, DuplicateKeyError
+from app.config import Config
+from app.database import db
+from .orchestrator import PIPELINE_STAGES, executor, extract_project_name, generate_project_id, run_pipeline
+
+logger = logging.getLogger(__name__)
+
+JOBS_COLLECTION = 'pipeline_jobs'
+
+# Jobs submitted by this process that have not finished yet, and the events that cancel them
+_pending = {}
+_cancel_events = {}
+_pending_lock = threading.Lock()
+
+# Only the most recent lines of streamed stage output (e.g. the miner's) are kept on the job
+MAX_STAGE_EVENTS = 200
+
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class JobQueueFull(Exception):
+    """Raised when PIPELINE_MAX_PENDING_JOBS jobs are already queued or running in this process."""
+
+
+def _now():
+    return datetime.utcnow()
+
+
+def _new_job(git_link, project_id, tasks, month_range, force):
+    now = _now()
+    return {
+        'job_id': uuid.uuid4().hex,
+        'git_link': git_link,
+        'project_id': project_id,
+        'project_name': extract_project_name(git_link),
+        'tasks': tasks,
+        'month_range': month_range,
+        'force': force,
+        'status': 'queued',
+        # Only set while the job is queued or running; a unique sparse index on it
+        # lets a single job per project be active across all web processes
+        'active_project_id': project_id,
+        'stages': {stage: {'status': 'pending'} for stage in PIPELINE_STAGES},
+        'submitted_at': now,
+        'updated_at': now,
+    }
+
+
+def _abandon_if_stale(job):
+    """
+    Mark a running job as failed if it has not reported progress in PIPELINE_JOB_STALE_SECONDS (its process died).
+    Queued jobs send no heartbeats while they wait for a free slot, so they are never considered stale.
+    """
+    if job.get('status') != 'running':
+        return False
+    age = (_now() - job['updated_at']).total_seconds()
+    if age < Config.PIPELINE_JOB_STALE_SECONDS:
+        return False
+    result = db[JOBS_COLLECTION].update_one(
+        {'job_id': job['job_id'], 'status': 'running', 'updated_at': job['updated_at']},
+        {'$set': {'status': 'failed', 'error': 'Job was abandoned (no progress reported).',
+                  'finished_at': _now(), 'updated_at': _now()},
+         '$unset': {'active_project_id': ''}}
+    )
+    if result.modified_count:
+        logger.warning(f"Abandoned stale pipeline job '{job['job_id']}' for project '{job['project_id']}'.")
+    return True
+
+
+def submit_pipeline_job(git_link, tasks="ALL", month_range="0,-1", force=False):
+    """
+    Enqueue run_pipeline for a git link and return (job, created); force bypasses the pipeline result cache.
+    If a job for the same project is already queued or running, that job is returned with created=False.
+    """
+    project_id = generate_project_id(extract_project_name(git_link))
+    collection = db[JOBS_COLLECTION]
+
+    for _ in range(2):
+        existing = collection.find_one({'active_project_id': project_id}, {'_id': 0})
+        if existing and not _abandon_if_stale(existing):
+            return existing, False
+
+        with _pending_lock:
+            if len(_pending) >= Config.PIPELINE_MAX_PENDING_JOBS:
+                raise JobQueueFull(f"{len(_pending)} pipeline jobs are already pending.")
+            job = _new_job(git_link, project_id, tasks, month_range, force)
+            try:
+                collection.insert_one(dict(job))
+            except DuplicateKeyError:
+                # Another request (possibly in another process) submitted the same project in the meantime
+                continue
+            _cancel_events[job['job_id']] = threading.Event()
+            _pending[job['job_id']] = executor.submit(_run_job, job['job_id'], git_link, tasks, month_range, force)
+        logger.info(f"Queued pipeline job '{job['job_id']}' for {git_link}.")
+        return job, True
+
+    existing = collection.find_one({'active_project_id': project_id}, {'_id': 0})
+    return existing, False
+
+
+def _update_stage(job_id, stage, status, events=None, **details):
+    now = _now()
+    fields = {f'stages.{stage}.status': status, 'updated_at': now}
+    update = {'$set': fields}
+    if events is not None:
+        # Output streamed while the stage runs; an empty batch still serves as a heartbeat
+        if events:
+            update['$push'] = {f'stages.{stage}.events': {'$each': events, '$slice': -MAX_STAGE_EVENTS}}
+    elif status == 'running':
+        fields[f'stages.{stage}.started_at'] = now
+    elif status != 'skipped':
+        fields[f'stages.{stage}.finished_at'] = now
+    for key, value in details.items():
+        fields[f'stages.{stage}.{key}'] = value
+    job = db[JOBS_COLLECTION].find_one_and_update({'job_id': job_id}, update,
+                                                  projection={'_id': 0, 'cancel_requested': 1})
+    # A cancellation may have been requested through another web process
+    if job and job.get('cancel_requested') and job_id in _cancel_events:
+        _cancel_events[job_id].set()
+
+
+def _finish_job(job_id, status, result=None, error=None):
+    now = _now()
+    fields = {'status': status, 'finished_at': now, 'updated_at': now}
+    if result is not None:
+        fields['result'] = result
+    if error is not None:
+        fields['error'] = error
+    update = {'$set': fields, '$unset': {'active_project_id': ''}}
+    try:
+        db[JOBS_COLLECTION].update_one({'job_id': job_id}, update)
+    except DocumentTooLarge:
+        # The full commit/issue documents can exceed 16 MB; they stay available in local_*_links
+        fields['result'] = {key: value for key, value in result.items() if key not in ('commit_data', 'issue_data')}
+        fields['result_truncated'] = True
+        db[JOBS_COLLECTION].update_one({'job_id': job_id}, update)
+
+
+def _run_job(job_id, git_link, tasks, month_range, force):
+    cancel_event = _cancel_events[job_id]
+    try:
+        now = _now()
+        job = db[JOBS_COLLECTION].find_one_and_update(
+            {'job_id': job_id, 'status': 'queued'},
+            {'$set': {'status': 'running', 'started_at': now, 'updated_at': now}},
+            projection={'_id': 0, 'cancel_requested': 1})
+        if job is None:
+            # Finished while it was queued (e.g. marked failed); its project may already have a newer job
+            logger.warning(f"Pipeline job '{job_id}' is no longer queued; not running it.")
+            return
+        if cancel_event.is_set() or job.get('cancel_requested'):
+            _finish_job(job_id, 'cancelled', error='Job was cancelled before it started.')
+            return
+
+        def progress(stage, status, **details):
+            _update_stage(job_id, stage, status, **details)
+
+        result = run_pipeline(git_link, tasks, month_range, progress=progress, force=force, cancel_event=cancel_event,
+                              run_id=job_id)
+        if cancel_event.is_set():
+            _finish_job(job_id, 'cancelled', result=result, error='Job was cancelled.')
+        elif result.get('error'):
+            _finish_job(job_id, 'failed', result=result, error=result['error'])
+        else:
+            _finish_job(job_id, 'succeeded', result=result)
+        logger.info(f"Pipeline job '{job_id}' finished.")
+    except Exception as e:
+        logger.error(f"Pipeline job '{job_id}' failed: {e}")
+        try:
+            _finish_job(job_id, 'failed', error=str(e))
+        except Exception as e:
+            logger.error(f"Error recording failure of pipeline job '{job_id}': {e}")
+    finally:
+        with _pending_lock:
+            _pending.pop(job_id, None)
+            _cancel_events.pop(job_id, None)
+
+
+def cancel_job(job_id):
+    """
+    Request cancellation of a queued or running job; the pipeline stops at its next check
+    (the miner within a few seconds). Returns the job, or None if it does not exist.
+    """
+    job = db[JOBS_COLLECTION].find_one_and_update(
+        {'job_id': job_id, 'status': {'$nin': list(FINISHED_STATUSES)}},
+        {'$set': {'cancel_requested': True, 'updated_at': _now()}},
+        projection={'_id': 0, 'active_project_id': 0})
+    if job is None:
+        return get_job(job_id)
+    with _pending_lock:
+        if job_id in _cancel_events:
+            _cancel_events[job_id].set()
+    logger.info(f"Cancellation requested for pipeline job '{job_id}'.")
+    return job
+
+
+def get_job(job_id):
+    """Return the public view of a job, or None if it does not exist."""
+    return db[JOBS_COLLECTION].find_one({'job_id': job_id}, {'_id': 0, 'active_project_id': 0})
+
+
+def public_job(job):
+    return {key: value for key, value in job.items() if key not in ('_id', 'active_project_id')}
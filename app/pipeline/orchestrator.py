@@ -2,26 +2,34 @@ import os
 import glob
 import json
 import logging
+import csv
 import concurrent.futures
 from datetime import datetime
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from app.database import db  # Shared connection pool; database name from MONGO_DB_NAME
 from .update_pex import update_pex_generator
 from .rust_runner import run_rust_code
 from .run_pex import run_forecast  # Still imported so forecast can run if needed
-from .store_commit_issues import process_project_data  # Import MongoDB processing
+from .store_commit_issues import ProjectIngest, load_links  # Import MongoDB processing
 from .github_metadata import get_github_metadata
+from .result_cache import find_local_mirror, get_cached_result, get_latest_result, resolve_head_sha, store_result
+from .watermarks import get_watermark, mining_since, save_watermark
+from .artifacts import artifact_path, migrate_forecaster_outputs, record_artifacts
+from .react_store import get_project_reacts, save_reacts, stale_react_months
+from .workspace import Workspace, cleanup_workspaces, find_artifacts
+from app.config import Config
+from app.services.month_cache import record_invalidation
+from app.utils.versioning import stamp_version
 
 load_dotenv()
 
-executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)  # Ensures non-blocking execution
+# Stages reported to the progress callback of run_pipeline, in the order they run
+PIPELINE_STAGES = ("head", "metadata", "scraper", "ingest", "forecast", "react", "net_vis")
+
+# Runs queued pipeline jobs (see app/pipeline/jobs.py); its size bounds how many pipelines run at once
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=Config.PIPELINE_MAX_CONCURRENCY,
+                                                 thread_name_prefix='pipeline')
 
-# ✅ **Correct MongoDB Connection**
-MONGODB_URI = os.environ.get("MONGODB_URI")
-# Change default from "testdb" to "decal-db" so that the correct DB is used
-db_name = os.environ.get("MONGO_DB_NAME", "decal-db")  # Use the correct DB name
-client = MongoClient(MONGODB_URI)
-db = client[db_name]  # Explicitly select database
 
 def extract_project_name(git_link):
     """Extract the project name from a git URL."""
@@ -39,9 +47,9 @@ def fetch_project_data_from_db(project_id):
     """
     result = {}
 
-    # Note: using projection {"_id": 0} to hide internal MongoDB identifiers
-    commit_data = db.local_commit_links.find_one({"project_id": project_id}, {"_id": 0})
-    issue_data = db.local_issue_links.find_one({"project_id": project_id}, {"_id": 0})
+    # Assembled from the project's month documents (internal MongoDB identifiers are left out)
+    commit_data = load_links("commit", project_id)
+    issue_data = load_links("issue", project_id)
 
     if commit_data:
         logging.info(f"Found commit links data in DB for project_id='{project_id}'")
@@ -52,8 +60,91 @@ def fetch_project_data_from_db(project_id):
 
     return result
 
-def run_pipeline(git_link, tasks="ALL", month_range="0,-1"):
-    """Orchestrates the entire pipeline and returns a structured JSON result."""
+def network_months(network):
+    """The {month: entries} map of a net-vis network, given as {"months": {...}} or keyed by month directly."""
+    if isinstance(network, dict) and isinstance(network.get("months"), dict):
+        network = network["months"]
+    if not isinstance(network, dict):
+        return {}
+    return {str(month): entries for month, entries in network.items() if str(month).isdigit()}
+
+def store_networks(project_id, project_name, net_vis_data):
+    """Store the tech and social networks of a net-vis file as month-keyed documents in local_tech_net /
+       local_social_net (the layout of tech_net / social_net), and return a summary of each for the response.
+    """
+    summary = {}
+    for kind in ("tech", "social"):
+        collection_name = f"local_{kind}_net"
+        months = network_months(net_vis_data.get(kind))
+        doc = stamp_version({"project_id": project_id, "project_name": project_name, "months": months})
+        db[collection_name].replace_one({"project_id": project_id}, doc, upsert=True)
+        record_invalidation(db, collection_name, project_id)
+        month_numbers = sorted(int(month) for month in months)
+        summary[f"{kind}_net"] = {
+            "months": len(month_numbers),
+            "first_month": month_numbers[0] if month_numbers else None,
+            "last_month": month_numbers[-1] if month_numbers else None,
+            "url": f"/api/{kind}_net/{project_id}/<month>",
+        }
+    logging.info(f"Stored net-vis networks for '{project_id}': {summary}")
+    return summary
+
+def merge_with_archive(output_dir, archive_dir, paths=None, skip=()):
+    """After a delta mining run, prepend the rows of the archived CSVs of the previous run to the new CSVs,
+       so the forecaster still sees the full history. Rows present in both are kept once.
+       paths limits the merge to some of the CSVs (default: all in output_dir); paths in skip are left alone.
+    """
+    for csv_path in paths if paths is not None else glob.glob(os.path.join(output_dir, "*.csv")):
+        if csv_path in skip:
+            continue
+        archived_path = os.path.join(archive_dir, os.path.basename(csv_path))
+        if not os.path.exists(archived_path):
+            continue
+        with open(archived_path, "r", encoding="utf-8", newline="") as f:
+            archived_rows = list(csv.reader(f))
+        with open(csv_path, "r", encoding="utf-8", newline="") as f:
+            new_rows = list(csv.reader(f))
+        if not archived_rows or not new_rows or archived_rows[0] != new_rows[0]:
+            logging.warning(f"Not merging {csv_path} with {archived_path}: headers differ.")
+            continue
+        seen = {tuple(row) for row in archived_rows[1:]}
+        merged = archived_rows + [row for row in new_rows[1:] if tuple(row) not in seen]
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            csv.writer(f).writerows(merged)
+        logging.info(f"Merged {len(new_rows) - 1} mined rows into {len(archived_rows) - 1} archived rows of {csv_path}")
+
+def affected_months(ingest_summary):
+    """Month indices (ints) that received new commits or issues in this run."""
+    months = set()
+    for file_type in ("commit", "issue"):
+        file_summary = (ingest_summary or {}).get(file_type)
+        if file_summary:
+            months.update(int(m_index) for m_index in file_summary["affected_months"])
+    return sorted(months)
+
+def report_progress(progress, stage, status, **details):
+    """Forward a stage event to the job's progress callback, if any; a failing callback never stops the pipeline."""
+    if progress is None:
+        return
+    try:
+        progress(stage, status, **details)
+    except Exception as e:
+        logging.error(f"Error reporting progress for stage '{stage}': {e}")
+
+def is_cancelled(cancel_event):
+    return cancel_event is not None and cancel_event.is_set()
+
+def run_pipeline(git_link, tasks="ALL", month_range="0,-1", progress=None, force=False, mirror_path=None,
+                 cancel_event=None, run_id=None):
+    """Orchestrates the entire pipeline and returns a structured JSON result.
+       progress, if given, is called as progress(stage, status, **details) when each stage starts and ends.
+       The result is cached per repository HEAD: unless force is set, a repository that has not changed
+       since its last run is answered from the cache. mirror_path points to a local mirror to read HEAD from.
+       Runs after the first are incremental: only commits/issues newer than the stored watermark are ingested,
+       and ReACT is only recomputed for months whose features changed (see react_store). force rebuilds everything.
+       Setting cancel_event stops the miner and the pipeline before its next stage.
+       run_id (the job id) names the run's workspace directory.
+    """
     result_summary = {}
 
     # Store the git link immediately.
@@ -62,13 +153,66 @@ def run_pipeline(git_link, tasks="ALL", month_range="0,-1"):
     # Extract project_name and compute project_id early
     project_name = extract_project_name(git_link)
     project_id = generate_project_id(project_name)
-    
+
+    # --- Resolve HEAD and serve an unchanged repository from the result cache ---
+    report_progress(progress, "head", "running")
+    head_sha = resolve_head_sha(git_link, mirror_path or find_local_mirror(project_name))
+    result_summary["head_sha"] = head_sha
+    result_summary["cached"] = False
+    if head_sha and not force:
+        cached_result = get_cached_result(project_id, head_sha, tasks, month_range)
+        if cached_result is not None:
+            logging.info(f"Serving cached pipeline result for '{project_id}' at {head_sha}.")
+            report_progress(progress, "head", "succeeded", head_sha=head_sha, cached=True)
+            for stage in PIPELINE_STAGES[1:]:
+                report_progress(progress, stage, "skipped")
+            cached_result.update(fetch_project_data_from_db(project_id))
+            cached_result["cached"] = True
+            return cached_result
+    report_progress(progress, "head", "succeeded", head_sha=head_sha, cached=False)
+
+    # Stages reported as failed, whether or not their error ended up in result_summary
+    failed_stages = set()
+
+    def track_progress(stage, status, **details):
+        if status == "failed":
+            failed_stages.add(stage)
+        report_progress(progress, stage, status, **details)
+
+    # Every run works in its own directories, so concurrent runs never read each other's CSVs
+    workspace = Workspace(project_id, run_id).create()
+    try:
+        run_stages(result_summary, git_link, project_name, project_id, workspace, tasks, month_range,
+                   track_progress, force, cancel_event)
+    finally:
+        workspace.finish()
+        try:
+            cleanup_workspaces(keep=[workspace.run_dir])
+        except Exception as e:
+            logging.error(f"Error cleaning up pipeline workspaces: {e}")
+
+    # Only complete runs are cached, so a failed stage is retried on the next submission
+    failed_stages.update(key for key, value in result_summary.items() if isinstance(value, dict) and "error" in value)
+    if failed_stages:
+        logging.warning(f"Not caching the result of '{project_id}': failed stages {sorted(failed_stages)}")
+    if head_sha and "error" not in result_summary and not failed_stages:
+        store_result(project_id, head_sha, tasks, month_range, result_summary)
+    return result_summary
+
+def run_stages(result_summary, git_link, project_name, project_id, workspace, tasks, month_range,
+               progress=None, force=False, cancel_event=None):
+    """Runs the pipeline stages after the HEAD check inside the run's workspace, filling result_summary.
+       Artifacts are passed between stages by explicit path (see find_artifacts).
+    """
     # --- Step 0: Fetch GitHub Repository Metadata ---
+    report_progress(progress, "metadata", "running")
     try:
         metadata = get_github_metadata(git_link)
           # Add it to the final JSON response
+        report_progress(progress, "metadata", "succeeded")
     except Exception as e:
         metadata = {"error": str(e)}
+        report_progress(progress, "metadata", "failed", error=str(e))
     result_summary["metadata"] = metadata
     
     # --- Step 1: Update and ensure PEX‑Forecaster ---
@@ -79,17 +223,49 @@ def run_pipeline(git_link, tasks="ALL", month_range="0,-1"):
     # result_summary["pex_update"] = pex_update
 
     # --- Step 2: Run the Rust scraper ---
+    watermark = None if force else get_watermark(project_id)
+    # Pass project_id and project_name so the CSV processing uses a consistent identifier
+    ingest = ProjectIngest(project_id, project_name, watermark=watermark)
+    merged_csvs = set()
+
+    def ingest_issues_early(command, output_folder, delta):
+        # The issue CSV is complete once its miner command has finished: start ingesting it while commits are mined
+        if command != "fetch_github_issues":
+            return
+        issue_csv = find_artifacts(output_folder)["issue_csv"]
+        if not issue_csv:
+            return
+        if delta:
+            merge_with_archive(output_folder, workspace.archive_dir, paths=[issue_csv])
+            merged_csvs.add(issue_csv)
+        logging.info(f"Issues mined; ingesting {issue_csv} while the commit miner runs.")
+        report_progress(progress, "ingest", "running")
+        ingest.submit(issue_csv, "issue")
+
+    report_progress(progress, "scraper", "running")
     try:
-        rust_result = run_rust_code(git_link)
+        rust_result = run_rust_code(
+            git_link, since=mining_since(watermark), cancel_event=cancel_event,
+            # Miner output, streamed into the job's scraper stage
+            on_events=lambda events: report_progress(progress, "scraper", "running", events=events),
+            output_dir=workspace.output_dir, on_command_done=ingest_issues_early)
     except Exception as e:
         rust_result = {"error": str(e)}
     result_summary["rust_result"] = rust_result
 
     # --- Verify output folder exists ---
     output_dir = rust_result.get("output_dir")
+    if rust_result.get("cancelled") or is_cancelled(cancel_event):
+        ingest.cancel()
+        result_summary["error"] = "Pipeline was cancelled."
+        report_progress(progress, "scraper", "cancelled")
+        return result_summary
     if not output_dir or not os.path.exists(output_dir):
+        ingest.cancel()
         result_summary["error"] = "Output directory not found after running OSS‑Scraper."
+        report_progress(progress, "scraper", "failed", error=rust_result.get("error", result_summary["error"]))
         return result_summary
+    report_progress(progress, "scraper", "succeeded")
 
     output_dir = os.path.abspath(output_dir)
     logging.info(f"Output directory: {output_dir}")
@@ -98,57 +274,93 @@ def run_pipeline(git_link, tasks="ALL", month_range="0,-1"):
         logging.info(f"Files in output directory: {files_in_output}")
     except Exception as e:
         logging.error(f"Error listing files in output directory: {e}")
+    if rust_result.get("delta"):
+        merge_with_archive(output_dir, workspace.archive_dir, skip=merged_csvs)
+    artifacts = find_artifacts(output_dir)
 
     # ✅ **Blocking MongoDB Processing (Ensures Completion)**
     logging.info("Starting MongoDB processing...")
-    # Pass project_id and project_name so the CSV processing uses a consistent identifier
-    process_project_data(output_dir, project_id, project_name)  # Ensures data is stored before fetching
+    report_progress(progress, "ingest", "running")
+    for file_type in ("commit", "issue"):
+        if artifacts[f"{file_type}_csv"]:
+            ingest.submit(artifacts[f"{file_type}_csv"], file_type)
+    ingest_summary = ingest.finish()  # Ensures data is stored before fetching
+
+    # --- (Cache collection) Move CSV files to the project's archive folder ---
+    # Before the watermark moves: a delta run only mines rows after it and prepends the archive, so the archive
+    # must already hold everything up to the watermark. Later stages read the CSVs from the archive.
+    try:
+        for csv_path in sorted({path for path in artifacts.values() if path}):
+            csv_dest = os.path.join(workspace.archive_dir, os.path.basename(csv_path))
+            os.replace(csv_path, csv_dest)
+            logging.info(f"Moved {csv_path} to {csv_dest}")
+            artifacts.update({kind: csv_dest for kind, path in artifacts.items() if path == csv_path})
+        record_artifacts(project_id, {kind: path for kind, path in artifacts.items() if path})
+        save_watermark(project_id, ingest_summary)
+    except Exception as e:
+        # Without the watermark the next run mines (and ingests) these rows again
+        logging.error(f"Error moving CSV files to archive: {e}")
+    for collection_name in ("local_commit_links", "local_issue_links"):
+        record_invalidation(db, collection_name, project_id)
+    incremental = bool(ingest_summary and ingest_summary["incremental"])
+    changed_months = affected_months(ingest_summary)
+    result_summary["ingest"] = {
+        "incremental": incremental,
+        "affected_months": changed_months,
+        "new_commits": ((ingest_summary or {}).get("commit") or {}).get("new_rows", 0),
+        "new_issues": ((ingest_summary or {}).get("issue") or {}).get("new_rows", 0),
+    }
+    report_progress(progress, "ingest", "succeeded", **result_summary["ingest"])
+
+    # Results of the previous run, reused for the months this run did not touch
+    previous_result = get_latest_result(project_id) if incremental else None
+    unchanged = incremental and not changed_months and previous_result is not None
 
-    # --- Step 3: Locate CSV files for social and technical networks ---
-    social_csvs = glob.glob(os.path.join(output_dir, "*_issues.csv"))
-    tech_csvs = glob.glob(os.path.join(output_dir, "*-commit-file-dev.csv"))
-    if not social_csvs:
+    # --- Step 3: Social and technical network CSVs of this run ---
+    social_csv = artifacts["social_csv"]
+    tech_csv = artifacts["tech_csv"]
+    if not social_csv:
         result_summary["error"] = "No social network CSV (_issues.csv) found."
+        report_progress(progress, "forecast", "failed", error=result_summary["error"])
         return result_summary
-    if not tech_csvs:
+    if not tech_csv:
         result_summary["error"] = "No technical network CSV found."
+        report_progress(progress, "forecast", "failed", error=result_summary["error"])
         return result_summary
-
-    social_csv = os.path.abspath(social_csvs[0])
-    tech_csv = os.path.abspath(tech_csvs[0])
     
     # --- Step 4: Run pex‑forecaster forecast (run for side effects only) ---
-    try:
-        pex_result = run_forecast(tech_csv, social_csv, project_name, tasks, month_range)
-        logging.info(f"pex-forecaster result {pex_result}")
-    except Exception as e:
-        logging.error("Forecast processing error: " + str(e))
+    # Its outputs for the project are recorded in the artifact index, which the later stages read
+    pex_generator_dir = os.getenv("PEX_GENERATOR_DIR")
+    if is_cancelled(cancel_event):
+        result_summary["error"] = "Pipeline was cancelled."
+        report_progress(progress, "forecast", "cancelled")
+        return result_summary
+    if unchanged:
+        # No new commits or issues: the forecasts and net-caches of the previous run are still current
+        logging.info(f"No new activity for '{project_id}'; skipping pex-forecaster.")
+        report_progress(progress, "forecast", "skipped")
+    else:
+        report_progress(progress, "forecast", "running")
+        try:
+            pex_result = run_forecast(tech_csv, social_csv, project_name, tasks, month_range)
+            logging.info(f"pex-forecaster result {pex_result}")
+            # run_forecast reports its failures as {"error"} rather than raising
+            if pex_result.get("error"):
+                raise Exception(pex_result["error"])
+            record_artifacts(project_id, pex_result.get("outputs") or {})
+            report_progress(progress, "forecast", "succeeded")
+        except Exception as e:
+            logging.error("Forecast processing error: " + str(e))
+            result_summary["forecast"] = {"error": str(e)}
+            report_progress(progress, "forecast", "failed", error=str(e))
+    if pex_generator_dir and not artifact_path(project_id, "net_cache"):
+        # Outputs of a forecast run before the artifact index existed
+        migrate_forecaster_outputs(project_id, pex_generator_dir, project_name)
 
     # ✅ Fetch Data from MongoDB and Add to Response (After Processing Completes)
     mongo_data = fetch_project_data_from_db(project_id)
     result_summary.update(mongo_data)
     
-    # --- Step 4 - (Cache collection) Move CSV files to archive folder ---
-    try:
-        parent_dir = os.path.dirname(output_dir)
-        archive_dir = os.path.join(parent_dir, "archive")
-
-        if not os.path.exists(archive_dir):
-            os.makedirs(archive_dir)
-
-        # Move files
-        social_csv_dest = os.path.join(archive_dir, os.path.basename(social_csv))
-        tech_csv_dest = os.path.join(archive_dir, os.path.basename(tech_csv))
-        
-        os.rename(social_csv, social_csv_dest)
-        os.rename(tech_csv, tech_csv_dest)
-
-        logging.info(f"Moved {social_csv} to {social_csv_dest}")
-        logging.info(f"Moved {tech_csv} to {tech_csv_dest}")
-    except Exception as e:
-        logging.error(f"Error moving CSV files to archive: {e}")
-
-    
 
     # --- Step 5: Run ReACT extractor ---
     # try:
@@ -160,30 +372,39 @@ def run_pipeline(git_link, tasks="ALL", month_range="0,-1"):
     #     result_summary["react"] = {"error": str(e)}
     
     # --- Step 5: Run ReACT extractor (all months)---
+    if is_cancelled(cancel_event):
+        result_summary["error"] = "Pipeline was cancelled."
+        report_progress(progress, "react", "cancelled")
+        return result_summary
+    report_progress(progress, "react", "running")
     try:
-        from .run_react import run_react_all
-        react_result = run_react_all()
+        from .run_react import react_feature_hashes, run_react_all
+        feature_csv = artifact_path(project_id, "net_cache")
+        if not feature_csv:
+            raise Exception(f"No net-caches CSV recorded for '{project_id}'.")
+        # ReACTs are stored per month; only months whose features changed since they were stored are recomputed
+        hashes = react_feature_hashes(feature_csv)
+        stale_months = sorted(hashes) if force else stale_react_months(project_id, hashes)
+        save_reacts(project_id, project_name, run_react_all(feature_csv, months=stale_months) if stale_months else {},
+                    hashes)
+        react_result = get_project_reacts(project_id)
         result_summary["react"] = react_result
-        logging.info(f"ReACT result obtained.")
+        logging.info(f"ReACT result obtained ({len(stale_months)} month(s) recomputed).")
+        report_progress(progress, "react", "succeeded", recomputed_months=len(stale_months))
     except Exception as e:
         logging.error("ReACT extractor failed: " + str(e))
         result_summary["react"] = {"error": str(e)}
+        report_progress(progress, "react", "failed", error=str(e))
 
     # --- Step 6: Process net-vis JSON file ---
+    report_progress(progress, "net_vis", "running")
     try:
-        pex_generator_dir = os.getenv("PEX_GENERATOR_DIR")
-        net_vis_file = os.path.join(pex_generator_dir, "net-vis", f"{project_name}.json")
+        net_vis_file = artifact_path(project_id, "net_vis") or os.path.join(pex_generator_dir, "net-vis", f"{project_name}.json")
         if os.path.exists(net_vis_file):
             with open(net_vis_file, 'r') as f:
                 net_vis_data = json.load(f)
-            tech_net = net_vis_data.get("tech", {})
-            social_net = net_vis_data.get("social", {})
-            tech_net["project_name"] = project_name
-            tech_net["project_id"] = project_id
-            social_net["project_name"] = project_name
-            social_net["project_id"] = project_id
-            result_summary["tech_net"] = tech_net
-            result_summary["social_net"] = social_net
+            # The networks are served month by month from Mongo; the response only summarises them
+            result_summary.update(store_networks(project_id, project_name, net_vis_data))
         else:
             result_summary["tech_net"] = {"error": f"File {net_vis_file} not found"}
             result_summary["social_net"] = {"error": f"File {net_vis_file} not found"}
@@ -193,10 +414,15 @@ def run_pipeline(git_link, tasks="ALL", month_range="0,-1"):
         logging.error("Process net-vis JSON file failed: " + str(e))
         result_summary["tech_net"] = {"error": str(e)}
         result_summary["social_net"] = {"error": str(e)}
+    net_vis_error = result_summary["tech_net"].get("error")
+    if net_vis_error:
+        report_progress(progress, "net_vis", "failed", error=net_vis_error)
+    else:
+        report_progress(progress, "net_vis", "succeeded")
 
     # --- Step 7: Read forecasts JSON file ---
     try:
-        forecasts_file = os.path.join(pex_generator_dir, "forecasts", f"{project_name}.json")
+        forecasts_file = artifact_path(project_id, "forecasts") or os.path.join(pex_generator_dir, "forecasts", f"{project_name}.json")
         if os.path.exists(forecasts_file):
             with open(forecasts_file, 'r') as f:
                 forecasts_data = json.load(f)
@@ -207,5 +433,4 @@ def run_pipeline(git_link, tasks="ALL", month_range="0,-1"):
     except Exception as e:
         logging.error("Read forecasts JSON file: " + str(e))
         result_summary["forecast_json"] = {"error": str(e)}
-
     return result_summary
@@ -0,0 +1,58 @@
+import logging
+from pymongo import DeleteMany, UpdateOne
+from app.database import db
+from app.services.month_cache import month_cache, poll_invalidations, record_invalidation
+from app.utils.versioning import stamp_version
+
+# One document per (project_id, month): {"project_id", "project_name", "month", "feature_hash", "reacts",
+# "data_version", "last_modified"}; reacts has the format_reacts structure
+REACTS_COLLECTION = "local_reacts"
+
+
+def get_react_hashes(project_id):
+    """Return {month: feature_hash} of the ReACTs stored for a project."""
+    return {doc["month"]: doc.get("feature_hash")
+            for doc in db[REACTS_COLLECTION].find({"project_id": project_id}, {"_id": 0, "month": 1, "feature_hash": 1})}
+
+
+def stale_react_months(project_id, hashes):
+    """The months (sorted) whose feature hash differs from the one their stored ReACTs were computed from."""
+    stored = get_react_hashes(project_id)
+    return sorted(month for month, feature_hash in hashes.items() if stored.get(month) != feature_hash)
+
+
+def save_reacts(project_id, project_name, reacts, hashes):
+    """
+    Store the recomputed months ({month: formatted ReACTs}) with their feature hashes, and remove
+    months that are no longer in the feature data.
+    """
+    operations = []
+    for month, month_reacts in reacts.items():
+        doc = stamp_version({"project_id": project_id, "project_name": project_name, "month": int(month),
+                             "feature_hash": hashes.get(int(month)), "reacts": month_reacts})
+        operations.append(UpdateOne({"project_id": project_id, "month": int(month)}, {"$set": doc}, upsert=True))
+    operations.append(DeleteMany({"project_id": project_id, "month": {"$nin": list(hashes)}}))
+    db[REACTS_COLLECTION].bulk_write(operations, ordered=False)
+    record_invalidation(db, REACTS_COLLECTION, project_id)
+    logging.info(f"Stored ReACTs of {len(reacts)} month(s) for '{project_id}'.")
+
+
+def get_project_reacts(project_id):
+    """Return {month: formatted ReACTs} of every stored month of a project, in month order."""
+    docs = db[REACTS_COLLECTION].find({"project_id": project_id}, {"_id": 0, "month": 1, "reacts": 1}).sort("month", 1)
+    return {doc["month"]: doc["reacts"] for doc in docs}
+
+
+def get_react_month(project_id, month):
+    """Return the stored ReACT document of one month of a project (served from the month cache), or None."""
+    poll_invalidations(db)
+
+    key = (REACTS_COLLECTION, project_id, str(month))
+    cached = month_cache.get(key)
+    if cached is not None:
+        return cached
+
+    doc = db[REACTS_COLLECTION].find_one({"project_id": project_id, "month": month}, {"_id": 0, "feature_hash": 0})
+    if doc:
+        month_cache.set(key, doc)
+    return doc
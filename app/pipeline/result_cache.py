@@ -0,0 +1,98 @@
+import os
+import json
+import logging
+import subprocess
+from datetime import datetime, timedelta
+from app.config import Config
+from app.database import db
+
+RESULTS_COLLECTION = "pipeline_results"
+
+# Keys of the pipeline result that are re-read from local_commit_links / local_issue_links on a cache hit
+# instead of being stored twice
+LIVE_KEYS = ("commit_data", "issue_data")
+
+
+def resolve_head_sha(git_link, mirror_path=None):
+    """Return the commit SHA of the repository's HEAD, or None if it cannot be resolved.
+       With a local mirror the SHA is read from it (after a fetch); otherwise it is asked from the remote.
+    """
+    timeout = Config.PIPELINE_HEAD_TIMEOUT_SECONDS
+    try:
+        if mirror_path:
+            subprocess.run(["git", "-C", mirror_path, "fetch", "--quiet", "origin"],
+                           capture_output=True, text=True, timeout=timeout)
+            output = subprocess.run(["git", "-C", mirror_path, "rev-parse", "HEAD"],
+                                    capture_output=True, text=True, check=True, timeout=timeout).stdout
+        else:
+            output = subprocess.run(["git", "ls-remote", git_link, "HEAD"],
+                                    capture_output=True, text=True, check=True, timeout=timeout).stdout
+        sha = output.split()[0] if output.strip() else None
+        logging.info(f"Resolved HEAD of {git_link}: {sha}")
+        return sha
+    except Exception as e:
+        logging.error(f"Could not resolve HEAD of {git_link}: {e}")
+        return None
+
+
+def _cache_key(project_id, head_sha, tasks, month_range):
+    return {"project_id": project_id, "head_sha": head_sha, "tasks": tasks, "month_range": month_range}
+
+
+def get_cached_result(project_id, head_sha, tasks, month_range):
+    """Return the stored pipeline result for this project at this HEAD, or None."""
+    query = _cache_key(project_id, head_sha, tasks, month_range)
+    # The TTL index removes expired entries only about once a minute, so check the age here as well
+    query["created_at"] = {"$gte": datetime.utcnow() - timedelta(seconds=Config.PIPELINE_RESULT_TTL_SECONDS)}
+    doc = db[RESULTS_COLLECTION].find_one(query, {"_id": 0, "result": 1})
+    return doc["result"] if doc else None
+
+
+def get_latest_result(project_id):
+    """Return the most recent stored pipeline result of a project, whatever its HEAD, or None."""
+    doc = db[RESULTS_COLLECTION].find_one({"project_id": project_id}, {"_id": 0, "result": 1},
+                                          sort=[("created_at", -1)])
+    return doc["result"] if doc else None
+
+
+def store_result(project_id, head_sha, tasks, month_range, result):
+    """Store a pipeline result for this project at this HEAD and evict older entries."""
+    # Round-trip through JSON so that non-string keys (ReACT months) can be stored, as they will be served
+    stored = json.loads(json.dumps({key: value for key, value in result.items() if key not in LIVE_KEYS}, default=str))
+    doc = dict(_cache_key(project_id, head_sha, tasks, month_range),
+               git_link=result.get("git_link"),
+               result=stored,
+               size_bytes=len(json.dumps(stored)),
+               created_at=datetime.utcnow())
+    try:
+        collection = db[RESULTS_COLLECTION]
+        collection.replace_one(_cache_key(project_id, head_sha, tasks, month_range), doc, upsert=True)
+        # Results for an older HEAD of the same project can never be served again
+        collection.delete_many({"project_id": project_id, "head_sha": {"$ne": head_sha}})
+        evict_results()
+        logging.info(f"Stored pipeline result for '{project_id}' at {head_sha} ({doc['size_bytes']} bytes).")
+    except Exception as e:
+        logging.error(f"Error storing pipeline result for '{project_id}': {e}")
+
+
+def evict_results():
+    """Keep at most PIPELINE_RESULT_CACHE_MAX_ENTRIES results, dropping the oldest first."""
+    collection = db[RESULTS_COLLECTION]
+    excess = collection.count_documents({}) - Config.PIPELINE_RESULT_CACHE_MAX_ENTRIES
+    if excess <= 0:
+        return 0
+    oldest = [doc["_id"] for doc in collection.find({}, {"_id": 1}).sort("created_at", 1).limit(excess)]
+    collection.delete_many({"_id": {"$in": oldest}})
+    logging.info(f"Evicted {len(oldest)} cached pipeline results.")
+    return len(oldest)
+
+
+def find_local_mirror(project_name):
+    """Return the path of a local mirror of the project under PIPELINE_MIRROR_DIR, if there is one."""
+    if not Config.PIPELINE_MIRROR_DIR:
+        return None
+    for candidate in (f"{project_name}.git", project_name):
+        path = os.path.join(Config.PIPELINE_MIRROR_DIR, candidate)
+        if os.path.isdir(path):
+            return path
+    return None
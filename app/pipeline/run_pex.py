@@ -1,25 +1,47 @@
 import os
-import sys
+import contextlib
 import pandas as pd
 import traceback
 import logging
 from dotenv import load_dotenv
 from .update_pex import ensure_pex_generator_repo
+from .stage_pool import StagePool, is_main_process
+from .forecast_cache import forecast_key, get_forecast, restore_outputs, store_forecast
+
+try:
+    import fcntl
+except ImportError:  # POSIX only; on Windows concurrent forecasts are not serialized
+    fcntl = None
 
 load_dotenv()
 
-PEX_GENERATOR_DIR = os.getenv("PEX_GENERATOR_DIR")
-if not PEX_GENERATOR_DIR:
-    raise Exception("PEX_GENERATOR_DIR environment variable is not set in your .env file.")
-if PEX_GENERATOR_DIR not in sys.path:
-    sys.path.insert(0, PEX_GENERATOR_DIR)
+# Folders of the pex-forecaster checkout it writes a project's outputs to, by artifact kind
+FORECASTER_OUTPUT_DIRS = {"net_cache": "net-caches", "net_vis": "net-vis", "forecasts": "forecasts"}
+# Lock file (in the checkout) held while a forecast writes those shared folders
+FORECASTER_LOCK_FILE = ".pex-outputs.lock"
 
-original_cwd = os.getcwd()
-os.chdir(PEX_GENERATOR_DIR)
-try:
+# Set in each pex_pool worker by load_forecaster
+_compute_forecast = None
+
+def load_forecaster():
+    """Runs once when a pex_pool worker starts: imports pex-forecaster, so its set-up is not paid per forecast."""
+    global _compute_forecast
     from decalfc.app.server import compute_forecast
-finally:
-    os.chdir(original_cwd)
+    _compute_forecast = compute_forecast
+    logging.info(f"pex-forecaster loaded in worker {os.getpid()}")
+
+# pex-forecaster runs in its own long-lived worker processes, started in PEX_GENERATOR_DIR (which it expects as cwd)
+pex_pool = StagePool("pex-forecaster", "PEX_GENERATOR_DIR", max_workers=int(os.getenv("PEX_POOL_WORKERS") or 1),
+                     preload=load_forecaster)
+
+def warm_forecaster_pool():
+    """Start the pex_pool workers in the background when the web process starts (PEX_POOL_WARM, default true)."""
+    if os.getenv("PEX_POOL_WARM", "true").lower() != "true" or not os.getenv("PEX_GENERATOR_DIR"):
+        return
+    # Spawned workers re-import the main module (e.g. run.py); they must not start pools of their own
+    if not is_main_process():
+        return
+    pex_pool.warm()
 
 def process_tech_data(tech_csv_path):
     """Reads the technical CSV into a DataFrame."""
@@ -37,29 +59,108 @@ def process_social_data(social_csv_path):
     except Exception as e:
         raise Exception(f"Error reading social CSV: {e}")
 
-def run_forecast(tech_csv, social_csv, project, tasks, month_range):
-    """Runs the forecasting pipeline and returns results."""
-    try:
-        tech_df = process_tech_data(tech_csv)
-        social_df = process_social_data(social_csv)
-        
-        request_pkg = {
-        "project_name": project,
-        "tech_data": tech_df,
-        "social_data": social_df,
-        "tasks": tasks.split(","),
-        "month_range": [int(x) for x in month_range.split(",")]
-        }
-        
-        original_dir = os.getcwd()
-        os.chdir(PEX_GENERATOR_DIR)
+@contextlib.contextmanager
+def _outputs_lock(directory="."):
+    """
+    Held while a forecast runs (or a cached one's files are put back), so the files that change in the
+    output folders of the checkout in directory are this forecast's own.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, FORECASTER_LOCK_FILE), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
         try:
-            result = compute_forecast(request_pkg)
+            yield
         finally:
-            os.chdir(original_dir)
-        # Convert result if it is a DataFrame.
-        if isinstance(result, pd.DataFrame):
-            result = result.to_dict(orient='records')
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _snapshot_outputs():
+    """{path: (mtime_ns, size)} of the files in the forecaster's output folders."""
+    snapshot = {}
+    for folder in FORECASTER_OUTPUT_DIRS.values():
+        if not os.path.isdir(folder):
+            continue
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[os.path.abspath(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+def _is_named_after(path, project):
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name == project or name.startswith(f"{project}-") or name.startswith(f"{project}_")
+
+def written_outputs(before, after, project):
+    """
+    The outputs a forecast of project wrote, from snapshots of the output folders taken before and after it:
+    {kind: absolute path or None}. net-vis and forecasts are <project>.json; of the net-caches CSVs written,
+    the one named after the project wins, else the only one.
+    """
+    written = [path for path, state in after.items() if before.get(path) != state]
+    outputs = {}
+    for kind, folder in FORECASTER_OUTPUT_DIRS.items():
+        folder = os.path.abspath(folder)
+        candidates = [path for path in written if os.path.dirname(path) == folder]
+        if kind == "net_cache":
+            candidates = [path for path in candidates if path.endswith(".csv")]
+            named = [path for path in candidates if _is_named_after(path, project)]
+            if named or len(candidates) > 1:
+                candidates = named
+        else:
+            candidates = [path for path in candidates if path == os.path.join(folder, f"{project}.json")]
+        outputs[kind] = candidates[0] if len(candidates) == 1 else None
+    return outputs
+
+def compute_forecast_in_worker(tech_csv, social_csv, project, tasks, month_range):
+    """
+    Runs inside a pex_pool worker, whose cwd is PEX_GENERATOR_DIR.
+    Returns {"forecast": result, "outputs": {kind: path of the file it wrote, or None}}.
+    """
+    if _compute_forecast is None:
+        load_forecaster()
+
+    tech_df = process_tech_data(tech_csv)
+    social_df = process_social_data(social_csv)
+
+    request_pkg = {
+    "project_name": project,
+    "tech_data": tech_df,
+    "social_data": social_df,
+    "tasks": tasks.split(","),
+    "month_range": [int(x) for x in month_range.split(",")]
+    }
+
+    # Forecasts write to the same folders; running them one at a time tells each one's files apart
+    with _outputs_lock():
+        before = _snapshot_outputs()
+        result = _compute_forecast(request_pkg)
+        outputs = written_outputs(before, _snapshot_outputs(), project)
+    # Convert result if it is a DataFrame.
+    if isinstance(result, pd.DataFrame):
+        result = result.to_dict(orient='records')
+    return {"forecast": result, "outputs": outputs}
+
+def run_forecast(tech_csv, social_csv, project, tasks, month_range):
+    """
+    Runs the forecasting pipeline in the pex-forecaster pool and returns
+    {"forecast": result, "outputs": {kind: path}} (see compute_forecast_in_worker), or {"error"}.
+    Results are cached under a hash of the inputs, so identical CSVs are not forecast twice; on a cache hit
+    the output files of the cached forecast are copied back into the checkout.
+    """
+    try:
+        key = forecast_key(tech_csv, social_csv, project, tasks, month_range)
+        cached = get_forecast(key)
+        if cached is not None:
+            logging.info(f"Using cached forecast {key} for {project}")
+            with _outputs_lock(pex_pool.directory):
+                restore_outputs(cached)
+            return {"forecast": cached["forecast"], "outputs": cached["outputs"]}
+        # Paths must be absolute: the worker's cwd is the forecaster checkout
+        result = pex_pool.run(compute_forecast_in_worker, os.path.abspath(tech_csv), os.path.abspath(social_csv),
+                              project, tasks, month_range)
+        store_forecast(key, result)
         return result
     except Exception as e:
         return {"error": str(e)}
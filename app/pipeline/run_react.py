@@ -1,13 +1,32 @@
 # flask-app/pipeline/run_react.py
 import os
-import sys
 import glob
 import json
+import hashlib
+import tempfile
 import pandas as pd
 from dotenv import load_dotenv
+from .stage_pool import StagePool
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional; the workers then parse the feature CSV themselves
+    feather = None
 
 load_dotenv()
 
+# The ReACT extractor runs in its own worker processes, started in REACT_API_DIR (which it expects as cwd);
+# run_react_all spreads the months over all of them
+react_pool = StagePool("ReACT", "REACT_API_DIR", max_workers=int(os.getenv("REACT_POOL_WORKERS") or os.cpu_count() or 1))
+
+# The feature CSV is converted once to an uncompressed Feather (Arrow) file here, which the workers load
+# instead of parsing the CSV
+REACT_FEATURES_DIR = os.getenv("REACT_FEATURES_DIR") or os.path.join(tempfile.gettempdir(), "react-features")
+
+# Per-worker caches of the parsed react_set.json and feature matrix (a DataFrame), keyed by (path, mtime)
+_react_set_cache = {}
+_feature_cache = {}
+
 def format_reacts(reacts):
     """
     Transforms the raw ReACT objects into a structure for the front‑end.
@@ -45,134 +64,160 @@ def format_reacts(reacts):
     formatted.sort(key=lambda x: x["importance"], reverse=True)
     return formatted
 
-def run_react():
+def _cached(cache, path, load):
+    """Return load(path), reusing the previous result while the file is unchanged (one entry per cache)."""
+    key = (path, os.path.getmtime(path))
+    if key not in cache:
+        cache.clear()
+        cache[key] = load(path)
+    return cache[key]
+
+def _read_react_set(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _read_features(path):
     """
-    Executes the ReACT extraction for a single month (like passing --month N).
-    - Loads the parent JSON (react_set.json).
-    - Locates the CSV file from net-caches.
-    - Uses total rows as the 'month' argument.
-    - Calls the ReACT_Extractor.
-    - Formats and returns the data for the frontend.
+    The whole feature matrix as a DataFrame. A Feather file is memory-mapped and converted in one copy,
+    which each worker makes once per version of the file (see _cached), not once per month.
     """
-    react_api_dir = os.getenv("REACT_API_DIR")
-    if not react_api_dir:
-        raise Exception("REACT_API_DIR is not set in your .env file.")
-    if react_api_dir not in sys.path:
-        sys.path.insert(0, react_api_dir)
-
-    original_dir = os.getcwd()
-    os.chdir(react_api_dir)
+    if path.endswith(".feather"):
+        return feather.read_table(path, memory_map=True).to_pandas()
+    return pd.read_csv(path)
 
+def load_react_inputs(feature_path):
+    """
+    Runs inside a react_pool worker (cwd = REACT_API_DIR): imports the extractor and loads
+    the parent JSON (react_set.json) and the feature matrix, both cached for the worker's later tasks.
+    """
     try:
-        # Import the extractor
+        # Import the extractor (with the updated logic for optional multi-month use)
         from react_extractor.extractor import ReACT_Extractor
     except ImportError as ie:
-        os.chdir(original_dir)
         raise Exception("Failed to import ReACT_Extractor. Check ReACT-API install.") from ie
 
-    parent_json = os.path.join(react_api_dir, "react_extractor", "react_set.json")
+    parent_json = os.path.join(os.getcwd(), "react_extractor", "react_set.json")
     if not os.path.exists(parent_json):
-        os.chdir(original_dir)
         raise Exception(f"Parent JSON file not found at {parent_json}")
 
-    with open(parent_json, 'r') as f:
-        original_data = json.load(f)
+    original_data = _cached(_react_set_cache, parent_json, _read_react_set)
+    feature_data = _cached(_feature_cache, feature_path, _read_features)
+    return ReACT_Extractor, original_data, feature_data
 
-    pex_generator_dir = os.getenv("PEX_GENERATOR_DIR")
-    if not pex_generator_dir:
-        os.chdir(original_dir)
-        raise Exception("PEX_GENERATOR_DIR is not set in your .env file.")
-
-    net_caches_dir = os.path.join(pex_generator_dir, "net-caches")
-    if not os.path.exists(net_caches_dir):
-        os.chdir(original_dir)
-        raise Exception(f"net-caches folder not found in {pex_generator_dir}")
-
-    csv_files = glob.glob(os.path.join(net_caches_dir, "*.csv"))
-    if not csv_files:
-        os.chdir(original_dir)
-        raise Exception("No CSV file found in the net-caches folder.")
-
-    feature_csv = csv_files[0]
-    feature_data = pd.read_csv(feature_csv)
+def prepare_features(feature_csv):
+    """
+    Converts the feature CSV to a Feather file under REACT_FEATURES_DIR (once per version of the CSV)
+    and returns its path; without pyarrow the CSV path itself is returned.
+    """
+    if feather is None:
+        return feature_csv
+    stat = os.stat(feature_csv)
+    prefix = hashlib.sha1(feature_csv.encode("utf-8")).hexdigest()
+    feature_path = os.path.join(REACT_FEATURES_DIR, f"{prefix}-{stat.st_mtime_ns}-{stat.st_size}.feather")
+    if os.path.exists(feature_path):
+        return feature_path
+
+    os.makedirs(REACT_FEATURES_DIR, exist_ok=True)
+    tmp_path = f"{feature_path}.{os.getpid()}.tmp"
+    feather.write_feather(pd.read_csv(feature_csv), tmp_path, compression="uncompressed")
+    os.replace(tmp_path, feature_path)
+    # Older conversions of the same CSV are not needed anymore
+    for stale in glob.glob(os.path.join(REACT_FEATURES_DIR, f"{prefix}-*.feather")):
+        if stale != feature_path:
+            os.remove(stale)
+    return feature_path
+
+def feature_months(feature_path):
+    """The sorted unique months of the feature matrix."""
+    if feature_path.endswith(".feather"):
+        months = feather.read_table(feature_path, columns=['month'], memory_map=True).column('month').to_pylist()
+    else:
+        months = pd.read_csv(feature_path, usecols=['month'])['month'].tolist()
+    return sorted({int(m) for m in months})
+
+def _file_sha1(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def react_feature_hashes(feature_csv):
+    """
+    Returns {month: hash} over the feature rows of each month, chained with every earlier month and
+    with react_set.json: a month's ReACTs only need recomputing when its hash changes.
+    """
+    feature_path = prepare_features(feature_csv)
+    react_api_dir = os.path.abspath(react_pool.directory)
+    digest = hashlib.sha1(_file_sha1(os.path.join(react_api_dir, "react_extractor", "react_set.json")).encode("utf-8"))
+
+    feature_data = _read_features(feature_path)
+    month_values = feature_data['month'].astype(int)
+    hashes = {}
+    for m, rows in feature_data.groupby(month_values, sort=True):
+        digest.update(pd.util.hash_pandas_object(rows, index=False).values.tobytes())
+        hashes[int(m)] = digest.hexdigest()
+    return hashes
+
+def react_in_worker(feature_path):
+    """Single-month extraction; runs inside a react_pool worker."""
+    ReACT_Extractor, original_data, feature_data = load_react_inputs(feature_path)
 
     # Use total number of rows as 'month'
     total_months = len(feature_data)
 
     reacts = ReACT_Extractor(original_data, feature_data, total_months)
-    os.chdir(original_dir)
+    return format_reacts(reacts)
 
-    formatted_reacts = format_reacts(reacts)
-    return formatted_reacts
-
-def run_react_all():
+def react_months_in_worker(feature_path, months):
     """
-    Executes the ReACT extraction for ALL months (like passing --all).
-    - Loads the parent JSON (react_set.json).
-    - Locates the CSV file from net-caches.
-    - Collects unique 'month' values and calls ReACT_Extractor for each month.
-    - Formats each month's results.
-    - Returns a dict keyed by month, each containing the front-end formatted data.
+    Extraction of a batch of months; runs inside a react_pool worker. Returns {month: formatted ReACTs}.
+    Like the single-month path, the extractor is given the whole feature matrix (it reads each month's history).
     """
-    react_api_dir = os.getenv("REACT_API_DIR")
-    if not react_api_dir:
-        raise Exception("REACT_API_DIR is not set in your .env file.")
-    if react_api_dir not in sys.path:
-        sys.path.insert(0, react_api_dir)
-
-    original_dir = os.getcwd()
-    os.chdir(react_api_dir)
+    ReACT_Extractor, original_data, feature_data = load_react_inputs(feature_path)
 
-    try:
-        # Import the extractor (with the updated logic for optional multi-month use)
-        from react_extractor.extractor import ReACT_Extractor
-    except ImportError as ie:
-        os.chdir(original_dir)
-        raise Exception("Failed to import ReACT_Extractor. Check ReACT-API install.") from ie
-
-    parent_json = os.path.join(react_api_dir, "react_extractor", "react_set.json")
-    if not os.path.exists(parent_json):
-        os.chdir(original_dir)
-        raise Exception(f"Parent JSON file not found at {parent_json}")
-
-    with open(parent_json, 'r') as f:
-        original_data = json.load(f)
-
-    pex_generator_dir = os.getenv("PEX_GENERATOR_DIR")
-    if not pex_generator_dir:
-        os.chdir(original_dir)
-        raise Exception("PEX_GENERATOR_DIR is not set in your .env file.")
-
-    net_caches_dir = os.path.join(pex_generator_dir, "net-caches")
-    if not os.path.exists(net_caches_dir):
-        os.chdir(original_dir)
-        raise Exception(f"net-caches folder not found in {pex_generator_dir}")
-
-    csv_files = glob.glob(os.path.join(net_caches_dir, "*.csv"))
-    if not csv_files:
-        os.chdir(original_dir)
-        raise Exception("No CSV file found in the net-caches folder.")
-
-    feature_csv = csv_files[0]
-    feature_data = pd.read_csv(feature_csv)
-
-    # Get all unique months
-    all_months = sorted(feature_data['month'].unique())
-
-    # Dictionary keyed by month -> formatted ReACT data
-    all_results = {}
-
-    for m in all_months:
+    results = {}
+    for m in months:
         # If your ReACT_Extractor has a 'write_output' argument, pass write_output=False
         # to avoid overwriting the extracted_react.json file multiple times.
         # Otherwise, just call it normally if you only have the single-month version.
-        raw_reacts_for_month = ReACT_Extractor(
-            original_data,
-            feature_data,
-            int(m),  # ensure int in case it's numpy.int64
-        )
+        raw_reacts_for_month = ReACT_Extractor(original_data, feature_data, m)
         # Format the extracted results for the front-end
-        all_results[int(m)] = format_reacts(raw_reacts_for_month)
+        results[m] = format_reacts(raw_reacts_for_month)
+    return results
 
-    os.chdir(original_dir)
-    return all_results
+def _month_batches(months, workers):
+    """Splits the months into contiguous batches, about four per worker so that slow months even out."""
+    size = max(1, -(-len(months) // (workers * 4)))
+    return [months[i:i + size] for i in range(0, len(months), size)]
+
+def run_react(feature_csv):
+    """
+    Executes the ReACT extraction for a single month (like passing --month N).
+    - Loads the parent JSON (react_set.json).
+    - Reads the project's net-caches CSV (feature_csv, from the artifact index).
+    - Uses total rows as the 'month' argument.
+    - Calls the ReACT_Extractor.
+    - Formats and returns the data for the frontend.
+    Runs in the ReACT worker pool, so the web process's cwd is never changed.
+    """
+    feature_path = prepare_features(feature_csv)
+    return react_pool.run(react_in_worker, feature_path)
+
+def run_react_all(feature_csv, from_month=None, months=None):
+    """
+    Executes the ReACT extraction for ALL months (like passing --all), only for months >= from_month,
+    or only for the given months.
+    - Converts the project's net-caches CSV (feature_csv, from the artifact index) to a Feather file the workers load once.
+    - Collects unique 'month' values and spreads them in batches over the ReACT worker pool.
+    - Formats each month's results.
+    - Returns a dict keyed by month (in month order), each containing the front-end formatted data.
+    """
+    feature_path = prepare_features(feature_csv)
+    wanted = None if months is None else {int(m) for m in months}
+    months = [m for m in feature_months(feature_path) if wanted is None or m in wanted]
+    if from_month is not None:
+        months = [m for m in months if m >= from_month]
+
+    batches = _month_batches(months, react_pool.max_workers)
+    all_results = {}
+    for results in react_pool.run_many(react_months_in_worker, [(feature_path, batch) for batch in batches]):
+        all_results.update(results)
+    return {m: all_results[m] for m in months}
@@ -1,13 +1,34 @@
 # flask-app/pipeline/rust_runner.py
 import subprocess
 import os
+import time
 import logging
+import threading
+import concurrent.futures
+from collections import deque
+from datetime import datetime
 from dotenv import load_dotenv
 
 load_dotenv()
 
 OSS_SCRAPER_REPO_URL = os.getenv("OSS_SCRAPER_REPO_URL")
 OSS_SCRAPER_DIR = os.getenv("OSS_SCRAPER_DIR")
+# Name of the miner option that limits mining to activity after a date (e.g. "--since"), if the miner build has one.
+# Without it every run mines the full history and the ingest step skips what is already stored.
+OSS_SCRAPER_SINCE_ARG = os.getenv("OSS_SCRAPER_SINCE_ARG")
+# Worker threads of the commit miner (defaults to the number of CPUs)
+OSS_SCRAPER_THREADS = int(os.getenv("OSS_SCRAPER_THREADS") or os.cpu_count() or 2)
+# Per-command time limits in seconds (unset or 0 = no limit)
+OSS_SCRAPER_ISSUES_TIMEOUT = int(os.getenv("OSS_SCRAPER_ISSUES_TIMEOUT_SECONDS") or 0) or None
+OSS_SCRAPER_COMMITS_TIMEOUT = int(os.getenv("OSS_SCRAPER_COMMITS_TIMEOUT_SECONDS") or 0) or None
+# Streamed output is handed to the progress callback in batches at this interval (also a liveness heartbeat)
+PROGRESS_INTERVAL_SECONDS = 2.0
+# Last lines of output kept per command for error messages
+OUTPUT_TAIL_LINES = 50
+
+
+class MinerCancelled(Exception):
+    """Raised when a miner command is stopped because the job was cancelled or the other command failed."""
 
 def ensure_oss_scraper_repo():
     """Ensures the OSS‑Scraper repository is cloned locally.
@@ -42,12 +63,84 @@ def ensure_oss_scraper_repo():
     
     return os.path.abspath(OSS_SCRAPER_DIR)
 
-def run_rust_code(git_link):
+def _stop_process(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def run_miner_command(name, cmd, cwd, timeout=None, on_events=None, should_stop=None):
+    """
+    Runs one miner command, streaming its stdout/stderr line by line instead of buffering them.
+    Every PROGRESS_INTERVAL_SECONDS the lines read so far are passed to on_events as
+    [{"command", "stream", "line", "at"}] (possibly empty). The process is terminated when it runs
+    longer than timeout (subprocess.TimeoutExpired) or when should_stop() returns True (MinerCancelled).
+    Returns the number of seconds the command took.
+    """
+    logging.info(f"Running command ({name}): " + " ".join(cmd))
+    started = time.monotonic()
+    process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+    pending = []
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    lock = threading.Lock()
+
+    def pump(stream, stream_name):
+        for line in stream:
+            line = line.rstrip("\n")
+            logging.info(f"[{name}] {line}")
+            with lock:
+                pending.append({"command": name, "stream": stream_name, "line": line, "at": datetime.utcnow()})
+                tail.append(line)
+        stream.close()
+
+    def flush():
+        with lock:
+            batch = pending[:]
+            pending.clear()
+        if on_events:
+            on_events(batch)
+
+    readers = [threading.Thread(target=pump, args=(process.stdout, "stdout"), daemon=True),
+               threading.Thread(target=pump, args=(process.stderr, "stderr"), daemon=True)]
+    for reader in readers:
+        reader.start()
+    try:
+        while True:
+            try:
+                process.wait(timeout=PROGRESS_INTERVAL_SECONDS)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            flush()
+            if should_stop and should_stop():
+                _stop_process(process)
+                raise MinerCancelled(f"{name} was cancelled.")
+            if timeout and time.monotonic() - started > timeout:
+                _stop_process(process)
+                raise subprocess.TimeoutExpired(cmd, timeout, output="\n".join(tail))
+    finally:
+        for reader in readers:
+            reader.join(timeout=5)
+        flush()
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, output="\n".join(tail))
+    return round(time.monotonic() - started, 1)
+
+def run_rust_code(git_link, since=None, on_events=None, cancel_event=None, output_dir=None, on_command_done=None):
     """
     Given a .git URL, this function:
       1. Ensures the OSS‑Scraper repository is cloned/updated.
       2. Runs `cargo clean` and `cargo build`.
-      3. Executes two miner commands to generate CSV outputs.
+      3. Executes the two (independent) miner commands in parallel to generate CSV outputs.
+    The CSVs are written to output_dir (the run's workspace); without it, to the shared OSS_SCRAPER_DIR/output.
+    With since (a datetime) and OSS_SCRAPER_SINCE_ARG configured, only activity from that date is mined.
+    Output of both commands is streamed to on_events (see run_miner_command); setting cancel_event stops them.
+    If one command fails the other is stopped as well.
+    on_command_done(name, output_folder, delta) is called as soon as each command has succeeded, while the other
+    one may still be running, so its CSVs can be processed early (see the "delta" key below).
     Returns a dictionary with the outputs.
     """
     try:
@@ -55,7 +148,7 @@ def run_rust_code(git_link):
         logging.info("OSS‑Scraper directory: " + scraper_dir)
 
         # Ensure the output folder exists (if not, create it)
-        output_folder = os.path.join(scraper_dir, "output")
+        output_folder = os.path.abspath(output_dir) if output_dir else os.path.join(scraper_dir, "output")
         if not os.path.exists(output_folder):
             logging.info(f"Output folder {output_folder} does not exist. Creating it.")
             os.makedirs(output_folder, exist_ok=True)
@@ -88,49 +181,77 @@ def run_rust_code(git_link):
         logging.info("Cargo fix output: " + build_result.stdout)
         """        
         
+        since_args = [f"{OSS_SCRAPER_SINCE_ARG}={since.isoformat()}"] if since and OSS_SCRAPER_SINCE_ARG else []
+
         cmd1 = [
             os.path.join("target", "debug", "miner"),
             "--fetch-github-issues",
             f"--github-url={git_link}",
-            "--github-output-folder=output"
-        ]
-        logging.info("Running command: " + " ".join(cmd1))
-        cmd1_result = subprocess.run(
-            cmd1,
-            cwd=scraper_dir,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        logging.info("Command 1 output: " + cmd1_result.stdout)
+            f"--github-output-folder={output_folder}"
+        ] + since_args
 
         cmd2 = [
             os.path.join("target", "debug", "miner"),
             "--commit-devs-files",
             "--time-window=30",
-            "--threads=2",
-            "--output-folder=output",
+            f"--threads={OSS_SCRAPER_THREADS}",
+            f"--output-folder={output_folder}",
             f"--git-online-url={git_link}"
-        ]
-        logging.info("Running command: " + " ".join(cmd2))
-        cmd2_result = subprocess.run(
-            cmd2,
-            cwd=scraper_dir,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        logging.info("Command 2 output: " + cmd2_result.stdout)
+        ] + since_args
+
+        commands = {
+            "fetch_github_issues": (cmd1, OSS_SCRAPER_ISSUES_TIMEOUT),
+            "commit_devs_files": (cmd2, OSS_SCRAPER_COMMITS_TIMEOUT),
+        }
+        failed = threading.Event()
+
+        def should_stop():
+            return failed.is_set() or (cancel_event is not None and cancel_event.is_set())
+
+        durations = {}
+        errors = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(commands)) as pool:
+            futures = {
+                pool.submit(run_miner_command, name, cmd, scraper_dir, timeout, on_events, should_stop): name
+                for name, (cmd, timeout) in commands.items()
+            }
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    durations[futures[future]] = future.result()
+                except Exception as e:
+                    # Stop the other command; the first error is the one reported
+                    failed.set()
+                    errors.append(e)
+                    continue
+                if on_command_done and not failed.is_set():
+                    try:
+                        on_command_done(futures[future], output_folder, bool(since_args))
+                    except Exception as e:
+                        logging.error(f"Error handling the output of {futures[future]}: {e}")
+        if errors:
+            real_errors = [e for e in errors if not isinstance(e, MinerCancelled)]
+            raise (real_errors or errors)[0]
+
+        logging.info(f"Miner commands finished in {durations} seconds.")
         logging.info("Final output directory: " + os.path.abspath(output_folder))
         
         return {
             # "fetch_github_issues": cmd1_result.stdout,
             # "commit_devs_files": cmd2_result.stdout,
-            "output_dir": os.path.abspath(output_folder)
+            "output_dir": os.path.abspath(output_folder),
+            "durations": durations,
+            # True when the CSVs only hold activity since the watermark
+            "delta": bool(since_args)
         }
     except subprocess.CalledProcessError as e:
         logging.error("Rust tool execution failed: " + str(e))
-        return {"error": "Rust tool execution failed: " + str(e)}
+        return {"error": "Rust tool execution failed: " + str(e), "output_tail": e.output}
+    except subprocess.TimeoutExpired as e:
+        logging.error("Rust tool timed out: " + str(e))
+        return {"error": "Rust tool timed out: " + str(e), "output_tail": e.output}
+    except MinerCancelled as e:
+        logging.warning("Rust tool execution cancelled: " + str(e))
+        return {"error": "Rust tool execution cancelled.", "cancelled": True}
     except Exception as ex:
         logging.error("Unexpected error: " + str(ex))
         return {"error": "Unexpected error: " + str(ex)}
@@ -0,0 +1,154 @@
+import os
+import sys
+import time
+import atexit
+import functools
+import logging
+import threading
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+
+
+def is_main_process():
+    """
+    False inside a pool worker. Spawned workers re-import the main module (e.g. run.py, which calls create_app),
+    so start-up side effects must check this before they run.
+    """
+    return multiprocessing.current_process().name == "MainProcess"
+
+
+def _init_worker(directory, preload=None):
+    """Runs once in every worker process: the forecaster and ReACT code expect to be run from their own checkout."""
+    if directory is not None:
+        os.chdir(directory)
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+    if preload is not None:
+        # Import the stage's code (and load its models) once per worker instead of once per task
+        preload()
+
+
+def _ping():
+    """Health check task; it only succeeds if the worker started (and preloaded) correctly."""
+    return {"pid": os.getpid(), "cwd": os.getcwd()}
+
+
+class StagePool:
+    """
+    A pool of long-lived worker processes whose current directory is `directory` (read from directory_env;
+    without one the workers keep the web process's cwd).
+    Stages that need a specific cwd (pex-forecaster, ReACT) run here instead of calling os.chdir
+    in the web process, where the working directory is shared by every thread; CPU-bound stages (ingest)
+    run here to get out from under the web process's GIL.
+    Workers are started with 'spawn', so they never inherit the web process's threads, locks or MongoClient.
+    If a worker dies the pool is replaced and the task is retried once.
+    """
+
+    def __init__(self, name, directory_env, max_workers=1, preload=None):
+        self.name = name
+        self.directory_env = directory_env
+        self.max_workers = max_workers
+        self.preload = preload
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats = {"started_at": None, "restarts": 0, "tasks_submitted": 0, "tasks_failed": 0,
+                       "last_error": None}
+
+    @property
+    def directory(self):
+        if self.directory_env is None:
+            return None
+        directory = os.getenv(self.directory_env)
+        if not directory:
+            raise Exception(f"{self.directory_env} is not set in your .env file.")
+        return os.path.abspath(directory)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                directory = self.directory
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(directory, self.preload),
+                )
+                if self._stats["started_at"] is None:
+                    atexit.register(self.shutdown)
+                self._stats["started_at"] = time.time()
+                logging.info(f"Started {self.name} pool ({self.max_workers} workers, cwd={directory})")
+            return self._executor
+
+    def _restart(self, broken):
+        """Drop a broken executor (unless another thread already replaced it); the next task starts a new one."""
+        with self._lock:
+            if broken is None or self._executor is not broken:
+                return
+            self._executor = None
+            self._stats["restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        logging.warning(f"{self.name} pool was broken (a worker died); restarting it.")
+
+    def _record_error(self, error):
+        self._stats["tasks_failed"] += 1
+        self._stats["last_error"] = f"{type(error).__name__}: {error}"
+
+    def submit(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) in a worker; arguments and result travel by value (pickled)."""
+        executor = self._get_executor()
+        self._stats["tasks_submitted"] += 1
+        try:
+            return executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            self._restart(executor)
+            return self._get_executor().submit(fn, *args, **kwargs)
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn in a worker and wait for its result; if the worker dies, restart the pool and retry once."""
+        return self.run_many(functools.partial(fn, **kwargs), [args])[0]
+
+    def run_many(self, fn, args_list):
+        """Run fn(*args) for every tuple in args_list across the workers; results come back in the order of args_list."""
+        for attempt in range(2):
+            executor = self._get_executor()
+            try:
+                futures = [self.submit(fn, *args) for args in args_list]
+                return [future.result() for future in futures]
+            except BrokenProcessPool as e:
+                self._record_error(e)
+                self._restart(executor)
+                if attempt:
+                    raise
+            except Exception as e:
+                self._record_error(e)
+                raise
+
+    def warm(self):
+        """Start the workers in the background (one ping each) without waiting for them."""
+        try:
+            for _ in range(self.max_workers):
+                self.submit(_ping)
+        except Exception as e:
+            logging.error(f"Could not start {self.name} pool: {e}")
+
+    def health_check(self, timeout=30):
+        """Run a ping task in the pool (restarting it if it is broken). Returns {"healthy": bool, ...}."""
+        executor = None
+        try:
+            executor = self._get_executor()
+            return dict(healthy=True, **executor.submit(_ping).result(timeout=timeout))
+        except BrokenProcessPool as e:
+            self._restart(executor)
+            return {"healthy": False, "error": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            return {"healthy": False, "error": f"{type(e).__name__}: {e}"}
+
+    def stats(self):
+        return dict(self._stats, name=self.name, max_workers=self.max_workers, running=self._executor is not None)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
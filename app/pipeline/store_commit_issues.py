@@ -2,19 +2,37 @@
 import csv
 import os
 import concurrent.futures
-from datetime import datetime
+import calendar
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
 from unidecode import unidecode
-from pymongo import MongoClient
+from pymongo import DeleteMany, ReplaceOne, UpdateMany, UpdateOne
+from app.database import db
 from dotenv import load_dotenv
+from app.utils.versioning import content_version, stamp_version
+from .stage_pool import StagePool
 import json
 
+try:
+    import pyarrow
+except ImportError:  # pyarrow is optional; the columnar engine then works on Python strings
+    pyarrow = None
+
 # Load environment variables from .env file (if present)
 load_dotenv()
 
-# Get the MongoDB URI from the environment (default if not set)
-MONGODB_URI = os.environ.get("MONGODB_URI", "mongodb://localhost:27017/testdb")
+# Collections the commit and issue entries are stored in, one document per (project_id, month index):
+# {"project_id", "project_name", "month", "last_fetched", "entries", "count", "data_version", "last_modified"}
+LINK_COLLECTIONS = {"commit": "local_commit_links", "issue": "local_issue_links"}
+
+# Date formats of the miner's CSVs, in the order they are tried
+DATETIME_FORMATS = {
+    "commit": ["%Y-%m-%d %H:%M:%S %Z", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S%z"],
+    "issue": ["%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%d %H:%M:%S %Z", "%Y-%m-%d %H:%M:%S"]
+}
 
-def detect_file_type(header_fields: list) -> str:
+def detect_file_type(header_fields: list, csv_file: str = None) -> str:
     """Determine if the CSV contains commit or issue data by analyzing headers."""
     lower_fields = [field.lower() for field in header_fields]
     if "commit_sha" in lower_fields or "commit_url" in lower_fields:
@@ -33,140 +51,485 @@ def parse_datetime(date_str: str, possible_formats: list) -> datetime:
             pass
     return None
 
-def process_csv_and_store(csv_file: str, earliest_dt: str = None, project_id: str = None, project_name: str = None):
-    """
-    Reads a CSV file of commit/issue data, detects type, groups by 'month index',
-    and upserts into MongoDB under either 'commit_links' or 'issue_links'.
+class DateParser:
+    """Parses the dates of one file, trying the format that matched the previous row first
+       (a file uses a single format, so every other row costs one strptime instead of up to four).
     """
 
-    # def clean_author_name(name: str) -> str:
-    #     """Remove diacritics and extra spaces from an author's name."""
-    #     return unidecode(name).strip() if name else ""
-
-    def get_month_index(event_dt: datetime, earliest_dt: datetime) -> int:
-        """Determine which 'month index' a given event_dt belongs to."""
-        return (event_dt.year - earliest_dt.year) * 12 + (event_dt.month - earliest_dt.month) + 1
+    def __init__(self, possible_formats: list):
+        self.possible_formats = possible_formats
+        self.format = None
 
-    def human_readable_date(dt: datetime) -> str:
-        """Convert a datetime into a human-readable format."""
-        return dt.strftime("%a %b %d %H:%M:%S %Y")
-    
-    def detect_file_type(header_fields: list) -> str:
-        """Determine if the CSV contains commit or issue data by analyzing headers."""
-        lower_fields = [field.lower() for field in header_fields]
-        if "commit_sha" in lower_fields or "commit_url" in lower_fields:
-            return "commit"
-        if "issue_url" in lower_fields:
-            return "issue"
-        print(f"WARNING: Could not determine file type for {csv_file}. Defaulting to 'commit'.")
-        return "commit"
-
-    def parse_datetime(date_str: str, possible_formats: list) -> datetime:
-        """Try parsing a datetime string using multiple formats."""
-        for fmt in possible_formats:
+    def parse(self, date_str: str) -> datetime:
+        if self.format:
             try:
-                return datetime.strptime(date_str, fmt)
+                return datetime.strptime(date_str, self.format)
             except ValueError:
                 pass
+        for fmt in self.possible_formats:
+            if fmt == self.format:
+                continue
+            try:
+                dt = datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+            self.format = fmt
+            return dt
         return None
 
+def to_utc_naive(dt: datetime) -> datetime:
+    """Normalize a parsed datetime to naive UTC, the form MongoDB returns, so it can be compared with a watermark."""
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+def month_origin(dt: datetime) -> datetime:
+    """
+    The earliest date in the naive form the month indices count from: the wall-clock time of the row, whose
+    year and month are month 1. Stored as is in a watermark, since MongoDB would shift an aware date to UTC,
+    possibly into the previous month.
+    """
+    if dt.tzinfo is not None:
+        return dt.replace(tzinfo=None)
+    return dt
+
+def get_month_index(year: int, month: int, earliest_dt: datetime) -> int:
+    """Determine which 'month index' a (year, month) belongs to."""
+    return (year - earliest_dt.year) * 12 + (month - earliest_dt.month) + 1
+
+def human_readable_date(dt: datetime) -> str:
+    """Convert a datetime into a human-readable format."""
+    return dt.strftime("%a %b %d %H:%M:%S %Y")
+
+def scan_csv(csv_file: str, since: dict = None) -> dict:
+    """
+    Stream a commit/issue CSV once, parsing every date a single time, and bucket its entries by calendar
+    (year, month); month indices are assigned later, once the project's earliest date is known.
+    With since ({"last_date", "last_link"}) only rows from last_date onwards are kept, but the earliest date
+    and the new watermark still cover every row.
+    Returns {"file_type", "project_hint", "earliest", "buckets", "watermark"}, or None for an empty file.
+    """
     if not os.path.isfile(csv_file):
         raise FileNotFoundError(f"CSV file not found: {csv_file}")
 
-    with open(csv_file, "r", encoding="utf-8") as f:
+    with open(csv_file, "r", encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
-        rows = list(reader)
-
-    if not rows:
+        file_type = detect_file_type(reader.fieldnames or [], csv_file)
+        date_field = "date" if file_type == "commit" else "created_at"
+        author_field = "name" if file_type == "commit" else "user_name"
+        parser = DateParser(DATETIME_FORMATS[file_type])
+        since_date = since["last_date"] if since else None
+
+        project_hint = None
+        buckets = {}
+        earliest, earliest_utc = None, None
+        last_date, last_link = None, None
+        for row in reader:
+            if project_hint is None:
+                project_hint = (row.get("project") or "").strip().lower() or (row.get("repo_name") or "").strip().lower()
+            raw_date = (row.get(date_field) or "").strip()
+            dt = parser.parse(raw_date) if raw_date else None
+            if not dt:
+                continue
+
+            utc_dt = to_utc_naive(dt)
+            if earliest_utc is None or utc_dt < earliest_utc:
+                earliest, earliest_utc = dt, utc_dt
+            link = row.get("commit_url") or row.get("issue_url") or ""
+            if last_date is None or utc_dt >= last_date:
+                last_date, last_link = utc_dt, link
+            if since_date and utc_dt < since_date:
+                continue
+
+            buckets.setdefault((dt.year, dt.month), []).append({
+                "human_date_time": human_readable_date(dt),
+                "link": link,
+                "dealised_author_full_name": row.get(author_field, "")
+            })
+
+    if project_hint is None:
         print(f"No data in {csv_file}. Nothing to process.")
-        return
+        return None
+    return {
+        "file_type": file_type,
+        "project_hint": project_hint,
+        "earliest": earliest,
+        "buckets": buckets,
+        "watermark": {"last_date": last_date, "last_link": last_link},
+    }
 
-    file_type = detect_file_type(reader.fieldnames or [])
+# Dates the columnar engine parses without strptime: "YYYY-mm-dd HH:MM:SS" (with ' ' or 'T' in between),
+# followed by a suffix with which the first matching format of the file type yields a naive datetime.
+# Anything else (UTC offsets, other timezone names, malformed values) is parsed row by row with DateParser,
+# exactly as scan_csv does.
+FAST_DATE_LAYOUT = r"\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d"
+FAST_DATE_SUFFIXES = {
+    "commit": {" ": ("", " UTC", " GMT")},
+    "issue": {"T": ("Z",), " ": ("", " UTC", " GMT")},
+}
+# Arrow strings make the vectorised string operations run in C++; without pyarrow they loop in Python
+DATE_STRING_DTYPE = "string[pyarrow]" if pyarrow is not None else object
+
+def _fast_dates(raw_dates, file_type: str):
+    """
+    Vectorised parse of raw_dates (a Series of str) into naive datetimes, with their human-readable form
+    built from the digits of the raw strings. Rows outside the fast path are NaT / None.
+    """
+    raw_dates = raw_dates.astype(DATE_STRING_DTYPE)
+    stamps, separators, suffixes = raw_dates.str.slice(0, 19), raw_dates.str.slice(10, 11), raw_dates.str.slice(19)
+    usable = pd.Series(False, index=raw_dates.index)
+    for separator, allowed in FAST_DATE_SUFFIXES[file_type].items():
+        usable |= (separators == separator).fillna(False) & suffixes.isin(allowed)
+    usable &= stamps.str.fullmatch(FAST_DATE_LAYOUT).fillna(False)
+    usable = usable.astype(bool)
+
+    # Impossible dates (February 30th, hour 24, ...) come out as NaT and are left to DateParser
+    stamps = stamps[usable].str.replace("T", " ", regex=False)
+    dates = pd.to_datetime(stamps, format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    # strftime("%Y") does not pad years before 1000 to four digits
+    dates = dates[dates.notna() & (dates.dt.year >= 1000)]
+    stamps = stamps[dates.index]
+    human_dates = (pd.Series(np.array(calendar.day_abbr, dtype=object)[dates.dt.dayofweek.to_numpy()], index=dates.index)
+                   + " " + pd.Series(np.array(calendar.month_abbr, dtype=object)[dates.dt.month.to_numpy()],
+                                     index=dates.index)
+                   + " " + stamps.str.slice(8, 10).astype(object) + " " + stamps.str.slice(11, 19).astype(object)
+                   + " " + stamps.str.slice(0, 4).astype(object))
+    return dates.reindex(raw_dates.index), human_dates.astype(object).reindex(raw_dates.index)
+
+def scan_csv_columnar(csv_file: str, since: dict = None) -> dict:
+    """
+    Same result as scan_csv, computed column-wise with pandas: the CSV is loaded in one go, dates are
+    parsed vectorised (see FAST_DATE_PATTERN) and the calendar month of every row is derived from integer arrays,
+    so only the entry dicts themselves are built in Python.
+    Falls back to scan_csv for files pandas cannot read.
+    """
+    if not os.path.isfile(csv_file):
+        raise FileNotFoundError(f"CSV file not found: {csv_file}")
+    try:
+        frame = pd.read_csv(csv_file, dtype=object, keep_default_na=False, encoding="utf-8")
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        print(f"Columnar ingest cannot read {csv_file} ({e}); falling back to row-by-row parsing.")
+        return scan_csv(csv_file, since)
+
+    file_type = detect_file_type(list(frame.columns), csv_file)
+    if frame.empty:
+        print(f"No data in {csv_file}. Nothing to process.")
+        return None
+    frame = frame.reset_index(drop=True)
     date_field = "date" if file_type == "commit" else "created_at"
+    author_field = "name" if file_type == "commit" else "user_name"
+
+    def column(name):
+        return frame[name] if name in frame.columns else pd.Series("", index=frame.index)
+
+    first_row = frame.iloc[0]
+    project_hint = (first_row.get("project") or "").strip().lower() or (first_row.get("repo_name") or "").strip().lower()
+
+    raw_dates = column(date_field).str.strip()
+    dates, human_dates = _fast_dates(raw_dates, file_type)
+    # Rows outside the fast path are parsed one by one, as scan_csv does; these may be timezone-aware
+    parsed = {}
+    parser = DateParser(DATETIME_FORMATS[file_type])
+    for position, raw_date in raw_dates[dates.isna() & (raw_dates != "")].items():
+        dt = parser.parse(raw_date)
+        if dt:
+            parsed[position] = dt
+
+    fast = dates.dropna()
+    utc = fast
+    local_fields = {"year": fast.dt.year, "month": fast.dt.month, "human_date_time": human_dates[fast.index]}
+    if parsed:
+        slow_index = pd.Index(list(parsed), dtype="int64")
+        utc = pd.concat([fast, pd.Series([to_utc_naive(dt) for dt in parsed.values()], index=slow_index,
+                                         dtype="datetime64[ns]")]).sort_index()
+        slow_fields = {"year": [dt.year for dt in parsed.values()], "month": [dt.month for dt in parsed.values()],
+                       "human_date_time": [human_readable_date(dt) for dt in parsed.values()]}
+        local_fields = {name: pd.concat([values, pd.Series(slow_fields[name], index=slow_index)]).sort_index()
+                        for name, values in local_fields.items()}
+    if utc.empty:
+        return {"file_type": file_type, "project_hint": project_hint, "earliest": None, "buckets": {},
+                "watermark": {"last_date": None, "last_link": None}}
+
+    links = column("commit_url").where(column("commit_url") != "", column("issue_url"))
+    # Earliest is the first row with the smallest UTC date, the watermark the last row with the largest one
+    earliest_position = utc.idxmin()
+    earliest = parsed.get(earliest_position) or fast[earliest_position].to_pydatetime()
+    last_position = utc.index[utc == utc.max()][-1]
+    watermark = {"last_date": utc[last_position].to_pydatetime(), "last_link": links[last_position]}
+
+    rows = pd.DataFrame({
+        "month_key": local_fields["year"].astype("int64") * 12 + local_fields["month"].astype("int64") - 1,
+        "human_date_time": local_fields["human_date_time"],
+        "link": links[utc.index],
+        "dealised_author_full_name": column(author_field)[utc.index],
+    })
+    if since and since.get("last_date"):
+        rows = rows[utc >= pd.Timestamp(since["last_date"])]
+
+    buckets = {}
+    # groupby keeps the file order of the rows within each month
+    for month_key, group in rows.groupby("month_key", sort=True):
+        buckets[(int(month_key) // 12, int(month_key) % 12 + 1)] = [
+            {"human_date_time": human_date, "link": link, "dealised_author_full_name": author}
+            for human_date, link, author in zip(group["human_date_time"], group["link"],
+                                                group["dealised_author_full_name"])
+        ]
+
+    return {
+        "file_type": file_type,
+        "project_hint": project_hint,
+        "earliest": earliest,
+        "buckets": buckets,
+        "watermark": watermark,
+    }
+
+# Ingest engine: "pandas" (scan_csv_columnar, the default) or "python" (scan_csv)
+INGEST_ENGINE = os.getenv("INGEST_ENGINE") or "pandas"
+SCANNERS = {"pandas": scan_csv_columnar, "python": scan_csv}
+
+# CSV scans run in their own processes, so the commit and issue files are parsed in parallel rather than
+# taking turns on the GIL (INGEST_POOL_WORKERS, default 2)
+ingest_pool = StagePool("ingest", None, max_workers=int(os.getenv("INGEST_POOL_WORKERS") or 2))
+
+def scan_file(csv_file: str, since: dict = None) -> dict:
+    """Scan a commit/issue CSV with the configured ingest engine."""
+    return SCANNERS[INGEST_ENGINE](csv_file, since)
+
+def scan_months(scan: dict, earliest_dt: datetime) -> dict:
+    """The entries of a scan as the document's months: {month index (str): [entries]}."""
+    months = {}
+    for (year, month), entries in sorted(scan["buckets"].items()):
+        m_index = str(get_month_index(year, month, earliest_dt))
+        months.setdefault(m_index, []).extend(entries)
+    return months
+
+def store_scan(scan: dict, earliest_dt: datetime, project_id: str = None, project_name: str = None,
+               since: dict = None):
+    """
+    Upsert the entries of a scanned CSV into MongoDB under 'local_commit_links' or 'local_issue_links',
+    one document per month index relative to earliest_dt (see LINK_COLLECTIONS). See process_csv_and_store.
+    """
+    file_type = scan["file_type"]
     # Use internal collection names in the DB but do not expose these names to API clients.
-    link_type = "local_commit_links" if file_type == "commit" else "local_issue_links"
+    link_type = LINK_COLLECTIONS[file_type]
 
     # Auto-detect project_id from CSV if not provided
     if not project_id:
-        first_row = rows[0]
-        project_id = first_row.get("project", "").strip().lower() or first_row.get("repo_name", "").strip().lower() or "unknown_project"
+        project_id = scan["project_hint"] or "unknown_project"
 
     # Auto-detect project_name if not provided
     if not project_name:
         project_name = project_id.capitalize()
 
-    datetime_formats = {
-        "commit": ["%Y-%m-%d %H:%M:%S %Z", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S%z"],
-        "issue": ["%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%d %H:%M:%S %Z", "%Y-%m-%d %H:%M:%S"]
-    }
-
-    all_datetimes = [parse_datetime(row.get(date_field, "").strip(), datetime_formats[file_type]) for row in rows if row.get(date_field)]
-    all_datetimes = [dt for dt in all_datetimes if dt]
-
-    if not all_datetimes:
-        print(f"No valid {file_type} date/times found in {csv_file}. Aborting.")
+    if scan["earliest"] is None:
+        print(f"No valid {file_type} date/times found. Aborting.")
         return
-        
-    # ✅ Add `last_fetched` outside `months` (human-readable format)
-    final_doc = {
-        "project_id": project_id,
-        "project_name": project_name,
-        "last_fetched": human_readable_date(datetime.utcnow()),  # Current timestamp
-        "months": {}
-    }
-
-    for row in rows:
-        raw_date = row.get(date_field, "").strip()
-        dt = parse_datetime(raw_date, datetime_formats[file_type]) if raw_date else None
-        if not dt:
-            continue
 
-        m_index = str(get_month_index(dt, earliest_dt))
-        if link_type == "local_commit_links":
-            with open("commit_months.json", "a") as f:
-                f.write(f"{m_index}\n")
-        else:
-            with open("issues_months.json", "a") as f:
-                f.write(f"{m_index}\n")
-        hr_date = human_readable_date(dt)
-        
-        if file_type == "commit":
-            author = row.get("name", "") 
+    collection = db[link_type]
+    # ✅ Add `last_fetched` to every month document (human-readable format)
+    last_fetched = human_readable_date(datetime.utcnow())  # Current timestamp
+    new_months = {int(m_index): entries for m_index, entries in scan_months(scan, earliest_dt).items()}
+
+    summary = {
+        "file_type": file_type,
+        "incremental": bool(since),
+        "watermark": scan["watermark"],
+    }
+    if not since:
+        operations = []
+        for month, entries in new_months.items():
+            shard = stamp_version({"project_id": project_id, "project_name": project_name, "month": month,
+                                   "last_fetched": last_fetched, "entries": entries, "count": len(entries)})
+            operations.append(ReplaceOne({"project_id": project_id, "month": month}, shard, upsert=True))
+        # Months that are gone, and the single per-project document of the layout before month documents
+        operations.append(DeleteMany({"project_id": project_id, "month": {"$nin": list(new_months)}}))
+        collection.bulk_write(operations, ordered=True)
+        summary["new_rows"] = sum(len(entries) for entries in new_months.values())
+        summary["affected_months"] = [str(month) for month in sorted(new_months)]
+        return summary
+
+    # Rows at exactly the watermark's timestamp may already be stored: skip links the affected months already hold
+    stored = {shard["month"]: shard for shard in collection.find(
+        {"project_id": project_id, "month": {"$in": list(new_months)}},
+        {"_id": 0, "month": 1, "data_version": 1, "entries.link": 1}
+    )}
+    for month, entries in list(new_months.items()):
+        known_links = {entry.get("link") for entry in stored.get(month, {}).get("entries", [])}
+        entries = [entry for entry in entries if entry["link"] not in known_links]
+        if entries:
+            new_months[month] = entries
         else:
-            author = row.get("user_name", "")
-            
-        cleaned_author = author
-        link = row.get("commit_url") or row.get("issue_url") or ""
-
-        entry = {
-            "human_date_time": hr_date,
-            "link": link,
-            "dealised_author_full_name": cleaned_author
-        }
-
-        final_doc["months"].setdefault(m_index, []).append(entry)
+            del new_months[month]
+
+    summary["new_rows"] = sum(len(entries) for entries in new_months.values())
+    summary["affected_months"] = [str(month) for month in sorted(new_months)]
+    if not new_months:
+        return summary
+
+    last_modified = datetime.utcnow().replace(microsecond=0)
+    operations = []
+    for month, entries in sorted(new_months.items()):
+        previous_version = stored.get(month, {}).get("data_version")
+        operations.append(UpdateOne({"project_id": project_id, "month": month}, {
+            "$set": {
+                # Chain the previous version with the appended entries instead of re-hashing the whole month
+                "data_version": content_version({"previous": previous_version, "entries": entries}),
+                "last_modified": last_modified,
+            },
+            "$push": {"entries": {"$each": entries}},
+            "$inc": {"count": len(entries)},
+        }, upsert=True))
+    operations.append(UpdateMany({"project_id": project_id},
+                                 {"$set": {"project_name": project_name, "last_fetched": last_fetched}}))
+    collection.bulk_write(operations, ordered=True)
+    return summary
+
+def load_links(file_type: str, project_id: str) -> dict:
+    """
+    Assemble the month documents of a project into one commit/issue document:
+    {"project_id", "project_name", "last_fetched", "months": {month index: entries}, "month_counts": {...},
+    "data_version", "last_modified"}, or None if nothing is stored.
+    """
+    shards = list(db[LINK_COLLECTIONS[file_type]].find({"project_id": project_id, "month": {"$exists": True}},
+                                                       {"_id": 0}).sort("month", 1))
+    if not shards:
+        return None
+    latest = max(shards, key=lambda shard: shard["last_modified"])
+    return {
+        "project_id": project_id,
+        "project_name": latest.get("project_name"),
+        "last_fetched": latest.get("last_fetched"),
+        "months": {str(shard["month"]): shard["entries"] for shard in shards},
+        # Number of entries per month index, so the distribution can be read without loading the entries
+        "month_counts": {str(shard["month"]): shard["count"] for shard in shards},
+        "data_version": content_version({"months": [shard["data_version"] for shard in shards]}),
+        "last_modified": latest["last_modified"],
+    }
 
-    client = MongoClient(MONGODB_URI)
-    db = client.get_default_database()
-    collection = db[link_type]
+def has_stored_links(file_type: str, project_id: str) -> bool:
+    """Whether the project already has commit/issue month documents that new entries can be appended to."""
+    return bool(project_id) and bool(db[LINK_COLLECTIONS[file_type]].count_documents(
+        {"project_id": project_id, "month": {"$exists": True}}, limit=1))
 
-    result = collection.replace_one({"project_id": project_id}, final_doc, upsert=True)
-    client.close()
+def process_csv_and_store(csv_file: str, earliest_dt: str = None, project_id: str = None, project_name: str = None,
+                          since: dict = None):
+    """
+    Reads a CSV file of commit/issue data, detects type, groups by 'month index',
+    and upserts one document per (project_id, month) into 'local_commit_links' or 'local_issue_links'
+    (see LINK_COLLECTIONS; load_links assembles them again).
 
-    #print(f"File classified as: {file_type.upper()}")
-    #print(f"Successfully upserted data for project_id='{project_id}'.")
-    #print(f"MongoDB upsert: matched_count={result.matched_count}, modified_count={result.modified_count}")
+    since is the watermark of the previous run for this file type ({"last_date", "last_link"}). When given,
+    only rows from last_date onwards that are not stored yet are appended to their month documents; otherwise
+    the project's month documents are replaced. Returns a summary with the months that changed and the new watermark.
+    """
+    scan = scan_file(csv_file, since)
+    if scan is None:
+        return None
+    if since and not has_stored_links(scan["file_type"], project_id):
+        # Nothing stored to append to (e.g. the collection was cleared): rebuild the whole document
+        since = None
+        scan = scan_file(csv_file)
+    return store_scan(scan, earliest_dt or scan["earliest"], project_id, project_name, since)
 
-def process_project_data(folder_path: str, project_id: str = None, project_name: str = None):
+class ProjectIngest:
     """
-    Detects commit and issue CSVs in a folder and processes them in parallel.
-    Now accepts optional project_id and project_name so that all CSVs are processed with a consistent identifier.
+    Ingest of the commit and issue CSVs of one pipeline run. Each CSV is handed over with submit() as soon as
+    its miner command has finished, so the issue CSV is ingested while commits are still being mined: it is
+    scanned in ingest_pool and, when the month indices are already known (incremental runs), stored right away.
+    finish() waits for the files, settles the project's first month and stores the rest, commits and issues
+    concurrently.
     """
 
-    commit_csv = None
-    issue_csv = None
+    def __init__(self, project_id: str = None, project_name: str = None, watermark: dict = None):
+        self.project_id = project_id
+        self.project_name = project_name
+        self.watermark = watermark
+        # Scans wait for ingest_pool and stores for MongoDB, so one thread per file type is enough
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="ingest")
+        self._tasks = {}
+
+    def submit(self, csv_file: str, file_type: str):
+        """Start ingesting a commit or issue CSV (once per file type)."""
+        if file_type in self._tasks:
+            return
+        since = self.watermark.get(file_type) if self.watermark else None
+        # Nothing stored to append to (e.g. the collection was cleared): rebuild that document
+        if since and not has_stored_links(file_type, self.project_id):
+            since = None
+        self._tasks[file_type] = self._executor.submit(self._ingest, csv_file, file_type, since)
+
+    def _ingest(self, csv_file: str, file_type: str, since: dict):
+        scan = ingest_pool.run(scan_file, csv_file, since)
+        summary = None
+        if scan is not None and self.watermark:
+            # Month indices keep counting from the stored first month; finish() rebuilds if the history moved
+            try:
+                summary = store_scan(scan, self.watermark["earliest_dt"], self.project_id, self.project_name, since)
+            except Exception as e:
+                print(f"Error in processing {file_type} file: {e}")
+        return {"csv_file": csv_file, "since": since, "scan": scan, "summary": summary}
+
+    def cancel(self):
+        """Drop the ingest of a run that failed; a scan that is already running finishes in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def finish(self) -> dict:
+        """
+        Wait for the submitted files and store what is not stored yet.
+        Returns {"earliest_dt", "incremental", "commit": summary, "issue": summary}, or None without data.
+        """
+        try:
+            return self._finish()
+        finally:
+            self._executor.shutdown()
 
-    # Auto-detect CSVs in folder
+    def _finish(self) -> dict:
+        results = {}
+        for file_type, task in self._tasks.items():
+            try:
+                results[file_type] = task.result()
+            except Exception as e:
+                print(f"Error in processing {file_type} file: {e}")
+        scans = {file_type: result["scan"] for file_type, result in results.items() if result["scan"] is not None}
+
+        # Month 1 is the month of the first commit (of the first issue without a commit CSV)
+        reference = scans.get("commit") or scans.get("issue")
+        if not reference or reference["earliest"] is None:
+            print(f"No data for {self.project_id}. Nothing to process.")
+            return None
+
+        earliest_dt = month_origin(reference["earliest"])
+        watermark = self.watermark
+        if watermark and earliest_dt < month_origin(watermark["earliest_dt"]):
+            print(f"History of {self.project_id} now starts before the stored watermark; rebuilding it.")
+            watermark = None
+            # The scans skipped rows older than the watermark; read those files again in full
+            rescans = [file_type for file_type in scans if results[file_type]["since"]]
+            for file_type, scan in zip(rescans, ingest_pool.run_many(scan_file, [(results[file_type]["csv_file"],)
+                                                                              for file_type in rescans])):
+                scans[file_type] = scan
+        if watermark:
+            earliest_dt = watermark["earliest_dt"]
+
+        summary = {"earliest_dt": earliest_dt, "incremental": bool(watermark), "commit": None, "issue": None}
+        if watermark:
+            # Already stored by _ingest
+            for file_type in scans:
+                summary[file_type] = results[file_type]["summary"]
+            return summary
+
+        stores = {file_type: self._executor.submit(store_scan, scan, earliest_dt, self.project_id, self.project_name)
+                  for file_type, scan in scans.items()}
+        for file_type, store in stores.items():
+            try:
+                summary[file_type] = store.result()
+            except Exception as e:
+                print(f"Error in processing {file_type} file: {e}")
+        return summary
+
+def detect_project_csvs(folder_path: str) -> dict:
+    """Find the commit and issue CSVs in a folder by their headers: {"commit": path, "issue": path}."""
+    csv_files = {}
     for file in os.listdir(folder_path):
         file_path = os.path.join(folder_path, file)
         if file.endswith(".csv"):
@@ -175,42 +538,29 @@ def process_project_data(folder_path: str, project_id: str = None, project_name:
                 headers = next(reader, None)
                 if headers:
                     if "commit_sha" in [h.lower() for h in headers] or "commit_url" in [h.lower() for h in headers]:
-                        commit_csv = file_path
+                        csv_files["commit"] = file_path
                     elif "issue_url" in [h.lower() for h in headers]:
-                        issue_csv = file_path
-                        
-    with open(commit_csv, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-
-    if not rows:
-        print(f"No data in {csv_file}. Nothing to process.")
-        return
-    
-    file_type = detect_file_type(reader.fieldnames or [])
-    date_field = "date" if file_type == "commit" else "created_at"
-    
-    datetime_formats = {
-        "commit": ["%Y-%m-%d %H:%M:%S %Z", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S%z"],
-        "issue": ["%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%d %H:%M:%S %Z", "%Y-%m-%d %H:%M:%S"]
-    }
+                        csv_files["issue"] = file_path
+    return csv_files
 
-    all_datetimes = [parse_datetime(row.get(date_field, "").strip(), datetime_formats[file_type]) for row in rows if row.get(date_field)]
-    all_datetimes = [dt for dt in all_datetimes if dt]
-    
-    earliest_dt = min(all_datetimes)
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-        futures = {}
-
-        if commit_csv:
-            futures[executor.submit(process_csv_and_store, commit_csv, earliest_dt, project_id, project_name)] = "commit"
-
-        if issue_csv:
-            futures[executor.submit(process_csv_and_store, issue_csv, earliest_dt, project_id, project_name)] = "issue"
+def process_project_data(folder_path: str, project_id: str = None, project_name: str = None, watermark: dict = None,
+                         commit_csv: str = None, issue_csv: str = None):
+    """
+    Detects commit and issue CSVs in a folder and processes them in parallel (see ProjectIngest).
+    Now accepts optional project_id and project_name so that all CSVs are processed with a consistent identifier.
+    With the watermark of the previous run only new commits/issues are appended (month indices keep counting from
+    the stored earliest date); without it, or if the history now starts earlier, the documents are rebuilt.
+    commit_csv / issue_csv skip the detection when the caller already knows the paths.
+    Each CSV is read once (see scan_csv / scan_csv_columnar). Returns {"earliest_dt", "incremental", "commit": summary, "issue": summary}.
+    """
 
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                future.result()  # Raises exceptions if any occur
-            except Exception as e:
-                print(f"Error in processing {futures[future]} file: {e}")
+    # Auto-detect CSVs in folder
+    if not commit_csv and not issue_csv:
+        csv_files = detect_project_csvs(folder_path)
+    else:
+        csv_files = {file_type: path for file_type, path in (("commit", commit_csv), ("issue", issue_csv)) if path}
+
+    ingest = ProjectIngest(project_id, project_name, watermark)
+    for file_type, path in csv_files.items():
+        ingest.submit(path, file_type)
+    return ingest.finish()
@@ -0,0 +1,36 @@
+import logging
+from datetime import datetime
+from app.database import db
+from .store_commit_issues import month_origin
+
+WATERMARKS_COLLECTION = "pipeline_watermarks"
+
+
+def get_watermark(project_id):
+    """Return what the previous pipeline run of a project ingested, or None if it was never ingested.
+       {"earliest_dt": month 1 of the project, "commit"/"issue": {"last_date", "last_link"} of the newest row}
+    """
+    return db[WATERMARKS_COLLECTION].find_one({"project_id": project_id}, {"_id": 0})
+
+
+def save_watermark(project_id, ingest_summary):
+    """Record the newest commit and issue ingested by a run (see ProjectIngest.finish)."""
+    if not ingest_summary or not ingest_summary.get("earliest_dt"):
+        return
+    fields = {"earliest_dt": month_origin(ingest_summary["earliest_dt"]), "updated_at": datetime.utcnow()}
+    for file_type in ("commit", "issue"):
+        file_summary = ingest_summary.get(file_type)
+        if file_summary and file_summary["watermark"]["last_date"]:
+            fields[file_type] = file_summary["watermark"]
+    db[WATERMARKS_COLLECTION].update_one({"project_id": project_id}, {"$set": fields}, upsert=True)
+    logging.info(f"Saved ingest watermark for '{project_id}': {fields}")
+
+
+def mining_since(watermark):
+    """The date the miner can start from: the older of the two watermarks, so neither stream misses rows."""
+    if not watermark:
+        return None
+    dates = [watermark[file_type]["last_date"] for file_type in ("commit", "issue") if watermark.get(file_type)]
+    if len(dates) < 2:
+        return None
+    return min(dates)
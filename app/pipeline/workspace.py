@@ -0,0 +1,115 @@
+import os
+import csv
+import glob
+import time
+import uuid
+import shutil
+import logging
+from app.config import Config
+
+# Layout under PIPELINE_WORKSPACE_ROOT:
+#   <project_id>/runs/<run_id>/output   miner CSVs of one pipeline run
+#   <project_id>/archive                CSVs of the project's latest completed run
+RUNS_DIR = "runs"
+ARCHIVE_DIR = "archive"
+# Written into a run directory when its pipeline has finished
+FINISHED_MARKER = ".finished"
+
+
+class Workspace:
+    """Directories of one pipeline run; nothing in them is shared with runs of other jobs."""
+
+    def __init__(self, project_id, run_id=None, root=None):
+        self.project_id = project_id
+        self.run_id = run_id or uuid.uuid4().hex
+        self.root = os.path.abspath(root or Config.PIPELINE_WORKSPACE_ROOT)
+        self.project_dir = os.path.join(self.root, project_id)
+        self.run_dir = os.path.join(self.project_dir, RUNS_DIR, self.run_id)
+        self.output_dir = os.path.join(self.run_dir, "output")
+        self.archive_dir = os.path.join(self.project_dir, ARCHIVE_DIR)
+
+    def create(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        logging.info(f"Created workspace {self.run_dir}")
+        return self
+
+    def finish(self):
+        with open(os.path.join(self.run_dir, FINISHED_MARKER), "w") as f:
+            f.write(time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+
+
+def _csv_header(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [field.lower() for field in next(csv.reader(f), None) or []]
+
+
+def find_artifacts(output_dir):
+    """Locate the miner outputs of a run once, so later stages get explicit paths instead of globbing.
+       Returns {"commit_csv", "issue_csv", "tech_csv", "social_csv"} (None for anything missing).
+    """
+    artifacts = {"commit_csv": None, "issue_csv": None, "tech_csv": None, "social_csv": None}
+    for path in sorted(glob.glob(os.path.join(output_dir, "*.csv"))):
+        header = _csv_header(path)
+        if "commit_sha" in header or "commit_url" in header:
+            artifacts["commit_csv"] = path
+        elif "issue_url" in header:
+            artifacts["issue_csv"] = path
+        if path.endswith("_issues.csv"):
+            artifacts["social_csv"] = path
+        elif path.endswith("-commit-file-dev.csv"):
+            artifacts["tech_csv"] = path
+    return artifacts
+
+
+def _last_activity(run_dir):
+    """Newest mtime in a run directory: a miner still writing its CSVs does not touch the run directory itself."""
+    latest = os.path.getmtime(run_dir)
+    for dirpath, _, filenames in os.walk(run_dir):
+        for path in [dirpath] + [os.path.join(dirpath, name) for name in filenames]:
+            try:
+                latest = max(latest, os.path.getmtime(path))
+            except OSError:
+                continue
+    return latest
+
+
+def cleanup_workspaces(root=None, retention_seconds=None, max_runs=None, stale_seconds=None, keep=()):
+    """
+    Apply the retention policy to finished runs: remove run directories older than
+    PIPELINE_WORKSPACE_RETENTION_SECONDS, then the oldest beyond PIPELINE_WORKSPACE_MAX_RUNS.
+    Runs without FINISHED_MARKER may still be in progress; they are only removed once nothing in them has
+    changed for PIPELINE_WORKSPACE_STALE_SECONDS (a run whose process died).
+    Per-project archives are kept; run dirs in keep are skipped.
+    Returns the number of run directories removed.
+    """
+    root = os.path.abspath(root or Config.PIPELINE_WORKSPACE_ROOT)
+    retention_seconds = Config.PIPELINE_WORKSPACE_RETENTION_SECONDS if retention_seconds is None else retention_seconds
+    max_runs = Config.PIPELINE_WORKSPACE_MAX_RUNS if max_runs is None else max_runs
+    stale_seconds = Config.PIPELINE_WORKSPACE_STALE_SECONDS if stale_seconds is None else stale_seconds
+    keep = {os.path.abspath(path) for path in keep}
+
+    now = time.time()
+    finished, expired = [], []
+    for run_dir in glob.glob(os.path.join(root, "*", RUNS_DIR, "*")):
+        if not os.path.isdir(run_dir) or os.path.abspath(run_dir) in keep:
+            continue
+        try:
+            if os.path.exists(os.path.join(run_dir, FINISHED_MARKER)):
+                finished.append((os.path.getmtime(run_dir), run_dir))
+            elif now - _last_activity(run_dir) > stale_seconds:
+                expired.append(run_dir)
+        except OSError:
+            continue
+    finished.sort()
+
+    remaining = [run_dir for mtime, run_dir in finished if now - mtime <= retention_seconds]
+    expired += [run_dir for mtime, run_dir in finished if now - mtime > retention_seconds]
+    if max_runs is not None and len(remaining) > max_runs:
+        expired += remaining[:len(remaining) - max_runs]
+
+    for run_dir in expired:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    if expired:
+        logging.info(f"Removed {len(expired)} pipeline workspaces from {root}")
+    return len(expired)
@@ -1,43 +1,82 @@
 # src/routes.py
 
-import math
-from flask import Blueprint, jsonify, redirect, request, url_for
+from flask import Blueprint, Response, current_app, jsonify, redirect, request, stream_with_context, url_for
 from flask_cors import cross_origin
 from app.config import Config
-from pymongo import MongoClient
+from app.database import db, pool_stats
 import logging
-from app.pipeline.orchestrator import run_pipeline
-from app.pipeline.run_pex import run_forecast
+from app.pipeline.jobs import FINISHED_STATUSES, JobQueueFull, cancel_job, get_job, public_job, submit_pipeline_job
+from app.pipeline.forecast_cache import forecast_cache_stats
+from app.pipeline.run_pex import pex_pool, run_forecast
+from app.pipeline.react_store import get_react_month
+from app.pipeline.run_react import react_pool
+from app.pipeline.store_commit_issues import ingest_pool
 from app.pipeline.rust_runner import run_rust_code
 from app.pipeline.update_pex import update_pex_generator
+from app.services.month_cache import cache_stats
+from app.services.listing_snapshots import serve_snapshot, snapshot_stats
+from app.services.project_data import get_project_month, find_project_months
+from app.utils.sanitize import sanitize_document
+from app.utils.http_cache import PUBLIC_PROJECTION, add_validators, document_validators, not_modified
 
 main_routes = Blueprint('main_routes', __name__)
 
-# Initialize MongoDB client
-mongo_client = MongoClient(Config.MONGODB_URI)
-db = mongo_client[Config.MONGODB_DB_NAME]
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# This is to prevent any error occurring because of NaN value - this is converted to null
-def sanitize_document(doc):
+
+def sanitize_tech_entries(data):
+    """
+    Sanitize technical network entries, expected as a list of [name, tech, number].
+    Malformed entries are replaced with ['', '', 0].
     """
-    Recursively sanitize the document by replacing NaN with None.
+    sanitized_data = []
+    for entry in data:
+        if isinstance(entry, list) and len(entry) == 3:
+            name, tech, value = entry
+            sanitized_entry = [
+                name if isinstance(name, str) else '',
+                tech if isinstance(tech, str) else '',
+                value if isinstance(value, (int, float)) else 0
+            ]
+            sanitized_data.append(sanitized_entry)
+        else:
+            # Handle unexpected data formats
+            sanitized_data.append(['', '', 0])
+    return sanitized_data
+
+def sanitize_social_entries(data):
     """
-    for key, value in doc.items():
-        if isinstance(value, float) and math.isnan(value):
-            doc[key] = None
-        elif isinstance(value, dict):
-            sanitize_document(value)
-        elif isinstance(value, list):
-            for idx, item in enumerate(value):
-                if isinstance(item, dict):
-                    sanitize_document(item)
-                elif isinstance(item, float) and math.isnan(item):
-                    value[idx] = None
-    return doc
+    Sanitize social network entries, expected as a list of [name, relation, number].
+    Entries with a malformed structure or a non-numeric value are skipped.
+    """
+    sanitized_data = []
+    for entry in data:
+        if isinstance(entry, list) and len(entry) == 3:
+            name, relation, value = entry
+
+            # Convert the value field to an integer or float
+            try:
+                value = int(value) if isinstance(value, str) and value.isdigit() else float(value)
+            except (TypeError, ValueError):
+                logger.warning(f"Invalid value in entry: {entry}")
+                continue  # Skip this entry if value conversion fails
+
+            sanitized_entry = [
+                name if isinstance(name, str) else '',
+                relation if isinstance(relation, str) else '',
+                value  # Use the converted numeric value
+            ]
+            sanitized_data.append(sanitized_entry)
+        else:
+            logger.warning(f"Skipping invalid entry structure: {entry}")
+    return sanitized_data
+
+NETWORK_SANITIZERS = {
+    'tech_net': sanitize_tech_entries,
+    'social_net': sanitize_social_entries,
+}
 
 # Homepage
 @main_routes.route('/')
@@ -57,9 +96,7 @@ def handle_invalid_path(invalid_path):
 @cross_origin(origin='*') 
 def get_all_projects():
     try:
-        projects = list(db.github_repositories.find({}, {'_id': 0}))
-        projects = [sanitize_document(project) for project in projects]
-        return jsonify({'projects': projects}), 200
+        return serve_snapshot(db, 'github_repositories', 'projects')
     except Exception as e:
         logger.error(f"Error fetching projects from MongoDB: {e}")
         return jsonify({'error': 'Failed to fetch projects.'}), 500
@@ -68,9 +105,7 @@ def get_all_projects():
 @main_routes.route('/api/github_stars', methods=['GET'])
 def get_github_stars():
     try:
-        repos = list(db.github_repositories.find({}, {'_id': 0}))
-        repos = [sanitize_document(repo) for repo in repos]
-        return jsonify({'repositories': repos}), 200
+        return serve_snapshot(db, 'github_repositories', 'repositories')
     except Exception as e:
         logger.error(f"Error fetching repositories from MongoDB: {e}")
         return jsonify({'error': 'Failed to fetch repositories.'}), 500
@@ -79,9 +114,7 @@ def get_github_stars():
 @main_routes.route('/api/github_repositories', methods=['GET'])
 def get_github_repositories():
     try:
-        repos = list(db.github_repositories.find({}, {'_id': 0}))
-        repos = [sanitize_document(repo) for repo in repos]
-        return jsonify({'repositories': repos}), 200
+        return serve_snapshot(db, 'github_repositories', 'repositories')
     except Exception as e:
         logger.error(f"Error fetching repositories from MongoDB: {e}")
         return jsonify({'error': 'Failed to fetch repositories.'}), 500
@@ -91,9 +124,7 @@ def get_github_repositories():
 @cross_origin(origin='*') 
 def get_project_description():
     try:
-        description = list(db.apache_projects.find({}, {'_id': 0}))
-        description = [sanitize_document(doc) for doc in description]
-        return jsonify({'description': description}), 200
+        return serve_snapshot(db, 'apache_projects', 'description')
     except Exception as e:
         logger.error(f"Error fetching project descriptions from MongoDB: {e}")
         return jsonify({'error': 'Failed to fetch project descriptions.'}), 500
@@ -106,9 +137,7 @@ def get_all_project_info():
     Fetch all project information.
     """
     try:
-        projects = list(db.project_info.find({}, {'_id': 0}))
-        projects = [sanitize_document(project) for project in projects]
-        return jsonify({'projects': projects}), 200
+        return serve_snapshot(db, 'project_info', 'projects')
     except Exception as e:
         logger.error(f"Error fetching project_info from MongoDB: {e}")
         return jsonify({'error': 'Failed to fetch project information.'}), 500
@@ -122,9 +151,7 @@ def get_all_eclipse_project_info():
     Fetch all project information.
     """
     try:
-        projects = list(db.eclipse_project_info.find({}, {'_id': 0}))
-        projects = [sanitize_document(project) for project in projects]
-        return jsonify({'projects': projects}), 200
+        return serve_snapshot(db, 'eclipse_project_info', 'projects')
     except Exception as e:
         logger.error(f"Error fetching project_info from MongoDB: {e}")
         return jsonify({'error': 'Failed to fetch project information.'}), 500
@@ -137,12 +164,73 @@ def get_all_monthly_ranges():
     Fetch all monthly ranges for all projects.
     """
     try:
-        projects = list(db.monthly_ranges.find({}, {'_id': 0}))
-        projects = [sanitize_document(project) for project in projects]
-        return jsonify({'project_ranges': projects}), 200
+        return serve_snapshot(db, 'monthly_ranges', 'project_ranges')
     except Exception as e:
         logger.error(f"Error fetching project_ranges from MongoDB: {e}")
+        return jsonify({'error': 'Failed to fetch monthly ranges.'}), 500
+
+
+# Hit/miss counters for the per-month response cache and the state of the listing snapshots
+@main_routes.route('/api/cache_stats', methods=['GET'])
+@cross_origin(origin='*')
+def get_cache_stats():
+    return jsonify({'month_cache': cache_stats(), 'listing_snapshots': snapshot_stats(),
+                    'forecast_cache': forecast_cache_stats()}), 200
 
+# Settings and event counters of this process's MongoDB connection pool
+@main_routes.route('/api/pool_stats', methods=['GET'])
+@cross_origin(origin='*')
+def get_pool_stats():
+    return jsonify(pool_stats()), 200
+
+@main_routes.route('/api/worker_pools', methods=['GET'])
+@cross_origin(origin='*')
+def get_worker_pools():
+    """
+    Stats of the pex-forecaster, ReACT and ingest worker pools; with ?check=true each pool also
+    runs a health check task (and is restarted if a worker has died).
+    """
+    try:
+        check = request.args.get('check', 'false').lower() == 'true'
+        pools = {}
+        for pool in (pex_pool, react_pool, ingest_pool):
+            health = pool.health_check() if check else None
+            pools[pool.name] = pool.stats()
+            if check:
+                pools[pool.name]['health'] = health
+        return jsonify(pools), 200
+    except Exception as e:
+        logging.error(f"Error getting worker pool stats: {e}")
+        return jsonify({'error': str(e)}), 500
+
+# ------------------ ReACT recommendations (local pipeline) ------------------
+
+@main_routes.route('/api/reacts/<project_id>/<int:month>', methods=['GET'])
+@cross_origin(origin='*')
+def get_reacts(project_id, month):
+    """
+    Fetch the ReACT recommendations the local pipeline stored for a project and month.
+    """
+    try:
+        normalized_project_id = project_id.strip().lower()
+        doc = get_react_month(normalized_project_id, month)
+        if not doc:
+            return jsonify({'error': f"No ReACTs found for project '{project_id}', month '{month}'."}), 404
+
+        validators = document_validators(doc)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
+
+        return add_validators(jsonify({
+            'project_id': doc['project_id'],
+            'project_name': doc.get('project_name'),
+            'month': month,
+            'data': doc['reacts']
+        }), validators), 200
+    except Exception as e:
+        logger.error(f"Error fetching ReACTs for project '{project_id}', month '{month}': {e}")
+        return jsonify({'error': 'Internal server error.'}), 500
 
 # ------------------ New API Endpoint: Tech Net Data ------------------
 
@@ -155,36 +243,29 @@ def get_tech_net(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower()
-        project = db.tech_net.find_one({'project_id': normalized_project_id})
+        # Projects analysed by the local pipeline are kept in local_tech_net
+        project = (get_project_month(db, 'tech_net', normalized_project_id, month)
+                   or get_project_month(db, 'local_tech_net', normalized_project_id, month))
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
         
         month_str = str(month)
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
-        data = project['months'][month_str]
-        # Sanitize data if necessary (assuming data is list of lists with [string, string, number])
-        sanitized_data = []
-        for entry in data:
-            if isinstance(entry, list) and len(entry) == 3:
-                name, tech, value = entry
-                sanitized_entry = [
-                    name if isinstance(name, str) else '',
-                    tech if isinstance(tech, str) else '',
-                    value if isinstance(value, (int, float)) else 0
-                ]
-                sanitized_data.append(sanitized_entry)
-            else:
-                # Handle unexpected data formats
-                sanitized_data.append(['', '', 0])
+        sanitized_data = sanitize_tech_entries(project['months'][month_str])
         
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'project_name': project['project_name'],
             'month': month,
             'data': sanitized_data
-        }), 200
+        }), validators), 200
     except Exception as e:
         logger.error(f"Error fetching tech_net data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -198,36 +279,27 @@ def get_eclipse_tech_net(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower().replace(' ','').replace('-','')
-        project = db.eclipse_tech_net.find_one({'project_id': normalized_project_id})
+        project = get_project_month(db, 'eclipse_tech_net', normalized_project_id, month)
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
         
         month_str = str(month)
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
-        data = project['months'][month_str]
-        # Sanitize data if necessary (assuming data is list of lists with [string, string, number])
-        sanitized_data = []
-        for entry in data:
-            if isinstance(entry, list) and len(entry) == 3:
-                name, tech, value = entry
-                sanitized_entry = [
-                    name if isinstance(name, str) else '',
-                    tech if isinstance(tech, str) else '',
-                    value if isinstance(value, (int, float)) else 0
-                ]
-                sanitized_data.append(sanitized_entry)
-            else:
-                # Handle unexpected data formats
-                sanitized_data.append(['', '', 0])
+        sanitized_data = sanitize_tech_entries(project['months'][month_str])
         
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'project_name': project['project_name'],
             'month': month,
             'data': sanitized_data
-        }), 200
+        }), validators), 200
     except Exception as e:
         logger.error(f"Error fetching tech_net data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -244,7 +316,9 @@ def get_social_net(project_id, month):
         normalized_project_id = project_id.strip().lower()
 
         # Fetch project from the database
-        project = db.social_net.find_one({'project_id': normalized_project_id})
+        # Projects analysed by the local pipeline are kept in local_social_net
+        project = (get_project_month(db, 'social_net', normalized_project_id, month)
+                   or get_project_month(db, 'local_social_net', normalized_project_id, month))
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
 
@@ -255,38 +329,21 @@ def get_social_net(project_id, month):
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
 
-        # Fetch data for the specified month
-        data = project['months'][month_str]
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
 
-        # Sanitize the data
-        sanitized_data = []
-        for entry in data:
-            if isinstance(entry, list) and len(entry) == 3:
-                name, relation, value = entry
-
-                # Convert the value field to an integer or float
-                try:
-                    value = int(value) if isinstance(value, str) and value.isdigit() else float(value)
-                except ValueError:
-                    logger.warning(f"Invalid value in entry: {entry}")
-                    continue  # Skip this entry if value conversion fails
-
-                sanitized_entry = [
-                    name if isinstance(name, str) else '',
-                    relation if isinstance(relation, str) else '',
-                    value  # Use the converted numeric value
-                ]
-                sanitized_data.append(sanitized_entry)
-            else:
-                logger.warning(f"Skipping invalid entry structure: {entry}")
+        # Fetch and sanitize the data for the specified month
+        sanitized_data = sanitize_social_entries(project['months'][month_str])
 
         # Return the processed data
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'project_name': project.get('project_name', 'Unknown Project'),
             'month': month,
             'data': sanitized_data
-        }), 200
+        }), validators), 200
 
     except Exception as e:
         logger.error(f"Error fetching social_net data for project '{project_id}', month '{month}': {e}")
@@ -305,7 +362,7 @@ def get_eclipse_social_net(project_id, month):
         normalized_project_id = project_id.strip().lower().replace(' ','').replace('-','')
 
         # Fetch project from the database
-        project = db.eclipse_social_net.find_one({'project_id': normalized_project_id})
+        project = get_project_month(db, 'eclipse_social_net', normalized_project_id, month)
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
 
@@ -316,42 +373,115 @@ def get_eclipse_social_net(project_id, month):
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
 
-        # Fetch data for the specified month
-        data = project['months'][month_str]
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
 
-        # Sanitize the data
-        sanitized_data = []
-        for entry in data:
-            if isinstance(entry, list) and len(entry) == 3:
-                name, relation, value = entry
-
-                # Convert the value field to an integer or float
-                try:
-                    value = int(value) if isinstance(value, str) and value.isdigit() else float(value)
-                except ValueError:
-                    logger.warning(f"Invalid value in entry: {entry}")
-                    continue  # Skip this entry if value conversion fails
-
-                sanitized_entry = [
-                    name if isinstance(name, str) else '',
-                    relation if isinstance(relation, str) else '',
-                    value  # Use the converted numeric value
-                ]
-                sanitized_data.append(sanitized_entry)
-            else:
-                logger.warning(f"Skipping invalid entry structure: {entry}")
+        # Fetch and sanitize the data for the specified month
+        sanitized_data = sanitize_social_entries(project['months'][month_str])
 
         # Return the processed data
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'month': month,
             'data': sanitized_data
-        }), 200
+        }), validators), 200
 
     except Exception as e:
         logger.error(f"Error fetching social_net data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
 
+def parse_month_range():
+    """
+    Read the optional 'from'/'to' query parameters of the range endpoints.
+    Returns (from_month, to_month, error); without 'to' the range is the MAX_MONTH_RANGE months from 'from'.
+    """
+    try:
+        from_month = int(request.args.get('from', 1))
+        to_month = request.args.get('to')
+        to_month = int(to_month) if to_month is not None else from_month + Config.MAX_MONTH_RANGE - 1
+    except ValueError:
+        return None, None, "'from' and 'to' must be integers."
+    if from_month < 1 or to_month < from_month:
+        return None, None, "Expected 1 <= from <= to."
+    if to_month - from_month + 1 > Config.MAX_MONTH_RANGE:
+        return None, None, f"At most {Config.MAX_MONTH_RANGE} months can be requested at once."
+    return from_month, to_month, None
+
+def stream_network_range(collection_name, network, project_id, normalized_project_id):
+    """
+    Fetch a range of months of a tech/social network in one query and stream them back as
+    {"project_id", "project_name", "from", "to", "months": {"<month>": [...], ...}}, one month at a time.
+    """
+    from_month, to_month, error = parse_month_range()
+    if error:
+        return jsonify({'error': error}), 400
+
+    months = range(from_month, to_month + 1)
+    project = find_project_months(db, collection_name, normalized_project_id, months)
+    if not project and collection_name == network:
+        # Projects analysed by the local pipeline are kept in local_tech_net / local_social_net
+        project = find_project_months(db, f'local_{network}', normalized_project_id, months)
+    if not project:
+        return jsonify({'error': f"Project '{project_id}' not found."}), 404
+
+    validators = document_validators(project, request.full_path)
+    unchanged = not_modified(validators)
+    if unchanged:
+        return unchanged
+
+    month_data = project.get('months') or {}
+    month_keys = sorted(int(m) for m in month_data if m.isdigit() and from_month <= int(m) <= to_month)
+    # An open-ended request reports the last month it returned rather than the cap
+    open_ended = request.args.get('to') is None
+    sanitize = NETWORK_SANITIZERS[network]
+
+    def generate():
+        header = {
+            'project_id': project['project_id'],
+            'project_name': project.get('project_name', 'Unknown Project'),
+            'from': from_month,
+            'to': (month_keys[-1] if month_keys else from_month) if open_ended else to_month,
+        }
+        dumps = current_app.json.dumps
+        yield dumps(header)[:-1] + ', "months": {'
+        for idx, month in enumerate(month_keys):
+            data = sanitize(month_data[str(month)])
+            yield ('' if idx == 0 else ', ') + f'"{month}": ' + dumps(data)
+        yield '}}'
+
+    response = Response(stream_with_context(generate()), status=200, mimetype='application/json')
+    return add_validators(response, validators)
+
+# [APACHE] Fetch a range of months of the technical or social network in one request
+@main_routes.route('/api/<any(tech_net, social_net):network>/<project_id>', methods=['GET'])
+@cross_origin(origin='*')
+def get_network_range(network, project_id):
+    """
+    Fetch technical/social network data for a project over ?from=<month>&to=<month>.
+    """
+    try:
+        normalized_project_id = project_id.strip().lower()
+        return stream_network_range(network, network, project_id, normalized_project_id)
+    except Exception as e:
+        logger.error(f"Error fetching {network} range for project '{project_id}': {e}")
+        return jsonify({'error': 'Internal server error.'}), 500
+
+# [ECLIPSE] Fetch a range of months of the technical or social network in one request
+@main_routes.route('/eclipse/<any(tech_net, social_net):network>/<project_id>', methods=['GET'])
+@cross_origin(origin='*')
+def get_eclipse_network_range(network, project_id):
+    """
+    Fetch technical/social network data for a project over ?from=<month>&to=<month>.
+    """
+    try:
+        normalized_project_id = project_id.strip().lower().replace(' ','').replace('-','')
+        return stream_network_range(f'eclipse_{network}', network, project_id, normalized_project_id)
+    except Exception as e:
+        logger.error(f"Error fetching {network} range for project '{project_id}': {e}")
+        return jsonify({'error': 'Internal server error.'}), 500
+
 # This is to fetch commit links data for a particular project for a particular month
 @main_routes.route('/api/commit_links/<project_id>/<int:month>', methods=['GET'])
 @cross_origin(origin='*') 
@@ -361,13 +491,18 @@ def get_commit_links(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower()
-        project = db.commit_links.find_one({'project_id': normalized_project_id})
+        project = get_project_month(db, 'commit_links', normalized_project_id, month)
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
         
         month_str = str(month)
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
         commits = project['months'][month_str]
         # Assuming commits is a list of dictionaries or lists; sanitize accordingly
@@ -387,12 +522,12 @@ def get_commit_links(project_id, month):
             else:
                 sanitized_commits.append({})
         
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'project_name': project['project_name'],
             'month': month,
             'commits': sanitized_commits
-        }), 200
+        }), validators), 200
     except Exception as e:
         logger.error(f"Error fetching commit_links data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -406,13 +541,18 @@ def get_eclipse_commit_links(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower()
-        project = db.eclipse_commit_links.find_one({'project_id': normalized_project_id})
+        project = get_project_month(db, 'eclipse_commit_links', normalized_project_id, month)
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
         
         month_str = str(month)
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
         commits = project['months'][month_str]
         # Assuming commits is a list of dictionaries or lists; sanitize accordingly
@@ -432,11 +572,11 @@ def get_eclipse_commit_links(project_id, month):
             else:
                 sanitized_commits.append({})
         
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'month': month,
             'commits': sanitized_commits
-        }), 200
+        }), validators), 200
     except Exception as e:
         logger.error(f"Error fetching commit_links data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -450,13 +590,18 @@ def get_email_links(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower()
-        project = db.email_links.find_one({'project_id': normalized_project_id})
+        project = get_project_month(db, 'email_links', normalized_project_id, month)
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
         
         month_str = str(month)
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
         commits = project['months'][month_str]
         # Assuming commits is a list of dictionaries or lists; sanitize accordingly
@@ -476,12 +621,12 @@ def get_email_links(project_id, month):
             else:
                 sanitized_commits.append({})
         
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'project_name': project['project_name'],
             'month': month,
             'commits': sanitized_commits
-        }), 200
+        }), validators), 200
     except Exception as e:
         logger.error(f"Error fetching email_links data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -495,13 +640,18 @@ def get_eclipse_email_links(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower()
-        project = db.eclipse_email_links.find_one({'project_id': normalized_project_id})
+        project = get_project_month(db, 'eclipse_email_links', normalized_project_id, month)
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
         
         month_str = str(month)
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
         commits = project['months'][month_str]
         # Assuming commits is a list of dictionaries or lists; sanitize accordingly
@@ -521,11 +671,11 @@ def get_eclipse_email_links(project_id, month):
             else:
                 sanitized_commits.append({})
         
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'month': month,
             'commits': sanitized_commits
-        }), 200
+        }), validators), 200
     except Exception as e:
         logger.error(f"Error fetching email_links data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -542,11 +692,17 @@ def get_project_info_api(project_id):
         project = db.project_info.find_one({'project_id': normalized_project_id})
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
-        # Remove MongoDB's _id field and sanitize
+        # Remove MongoDB's _id and version fields and sanitize
         project = sanitize_document(project)
-        project.pop('_id', None)
-        return jsonify(project), 200
+        for field in PUBLIC_PROJECTION:
+            project.pop(field, None)
+        return add_validators(jsonify(project), validators), 200
     except Exception as e:
         logger.error(f"Error fetching project_info for project '{project_id}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -561,22 +717,27 @@ def get_commit_measure(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower()
-        project = db.commit_measure.find_one({'project_id': normalized_project_id})
+        project = get_project_month(db, 'commit_measure', normalized_project_id, month)
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
         
         month_str = str(month)
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
         data = project['months'][month_str]
         # Directly return the data without processing into a list
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'project_name': project['project_name'],
             'month': month,
             'data': data  # Ensure 'data' is a dictionary/object
-        }), 200
+        }), validators), 200
     except Exception as e:
         logger.error(f"Error fetching commit_measure data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -590,21 +751,26 @@ def get_eclipse_commit_measure(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower().replace(' ','').replace('-','')
-        project = db.eclipse_commit_measure.find_one({'project_id': normalized_project_id})
+        project = get_project_month(db, 'eclipse_commit_measure', normalized_project_id, month)
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
         
         month_str = str(month)
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
         data = project['months'][month_str]
         # Directly return the data without processing into a list
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'month': month,
             'data': data  # Ensure 'data' is a dictionary/object
-        }), 200
+        }), validators), 200
     except Exception as e:
         logger.error(f"Error fetching commit_measure data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -619,22 +785,27 @@ def get_email_measure(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower()
-        project = db.email_measure.find_one({'project_id': normalized_project_id})
+        project = get_project_month(db, 'email_measure', normalized_project_id, month)
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
         
         month_str = str(month)
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
         data = project['months'][month_str]
        # Directly return the data without processing into a list
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'project_name': project['project_name'],
             'month': month,
             'data': data  # Ensure 'data' is a dictionary/object
-        }), 200 
+        }), validators), 200 
     except Exception as e:
         logger.error(f"Error fetching email_measure data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -649,21 +820,26 @@ def get_eclipse_email_measure(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower().replace(' ','').replace('-','')
-        project = db.eclipse_email_measure.find_one({'project_id': normalized_project_id})
+        project = get_project_month(db, 'eclipse_email_measure', normalized_project_id, month)
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
         
         month_str = str(month)
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
         data = project['months'][month_str]
        # Directly return the data without processing into a list
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'month': month,
             'data': data  # Ensure 'data' is a dictionary/object
-        }), 200 
+        }), validators), 200 
     except Exception as e:
         logger.error(f"Error fetching email_measure data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -678,21 +854,26 @@ def get_eclipse_issue_measure(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower().replace(' ','').replace('-','')
-        project = db.eclipse_issue_measure.find_one({'project_id': normalized_project_id})
+        project = get_project_month(db, 'eclipse_issue_measure', normalized_project_id, month)
         if not project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
         
         month_str = str(month)
         if 'months' not in project or month_str not in project['months']:
             return jsonify({'error': f"Month '{month}' data not found for project '{project_id}'."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
         data = project['months'][month_str]
        # Directly return the data without processing into a list
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project['project_id'],
             'month': month,
             'data': data  # Ensure 'data' is a dictionary/object
-        }), 200 
+        }), validators), 200 
     except Exception as e:
         logger.error(f"Error fetching email_measure data for project '{project_id}', month '{month}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -707,12 +888,17 @@ def get_grad_forecast_api(project_id):
     """
     try:
         normalized_project_id = project_id.strip().lower()
-        project = db.grad_forecast.find_one({'project_id': normalized_project_id}, {'forecast': 1, '_id': 0})
+        project = db.grad_forecast.find_one({'project_id': normalized_project_id}, {'forecast': 1, 'data_version': 1, 'last_modified': 1, '_id': 0})
         if not project or 'forecast' not in project:
             return jsonify({'error': f"Forecast data for project '{project_id}' not found."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
         # Return only the forecast data
-        return jsonify(project['forecast']), 200
+        return add_validators(jsonify(project['forecast']), validators), 200
     except Exception as e:
         logger.error(f"Error fetching forecast data for project '{project_id}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -726,12 +912,17 @@ def get_eclipse_grad_forecast_api(project_id):
     """
     try:
         normalized_project_id = project_id.strip().lower().replace(' ','').replace('-','')
-        project = db.eclipse_grad_forecast.find_one({'project_id': normalized_project_id}, {'forecast': 1, '_id': 0})
+        project = db.eclipse_grad_forecast.find_one({'project_id': normalized_project_id}, {'forecast': 1, 'data_version': 1, 'last_modified': 1, '_id': 0})
         if not project or 'forecast' not in project:
             return jsonify({'error': f"Forecast data for project '{project_id}' not found."}), 404
+
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
         
         # Return only the forecast data
-        return jsonify(project['forecast']), 200
+        return add_validators(jsonify(project['forecast']), validators), 200
     except Exception as e:
         logger.error(f"Error fetching forecast data for project '{project_id}': {e}")
         return jsonify({'error': 'Internal server error.'}), 500
@@ -746,7 +937,7 @@ def get_predictions_api(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower()
-        project = db.grad_forecast.find_one({'project_id': normalized_project_id}, {'forecast': 1, 'project_name': 1, '_id': 0})
+        project = db.grad_forecast.find_one({'project_id': normalized_project_id}, {'forecast': 1, 'project_name': 1, 'data_version': 1, 'last_modified': 1, '_id': 0})
         if not project or 'forecast' not in project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
 
@@ -755,6 +946,11 @@ def get_predictions_api(project_id, month):
         if month_str not in forecast:
             return jsonify({'error': f"Forecast data for month '{month}' not found for project '{project_id}'."}), 404
 
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
+
         current_close = forecast[month_str]['close']
 
         # Determine adjustment factor (reduced from 5% to 3%)
@@ -780,11 +976,11 @@ def get_predictions_api(project_id, month):
                 logger.warning(f"Forecast data for month '{next_month}' is missing for project '{project_id}'.")
                 continue
 
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project_id,
             'month': month,
             'adjusted_forecast': adjusted_forecast
-        }), 200
+        }), validators), 200
 
     except Exception as e:
         logger.error(f"Error fetching predictions for project '{project_id}', month '{month}': {e}")
@@ -800,7 +996,7 @@ def get_eclipse_predictions_api(project_id, month):
     """
     try:
         normalized_project_id = project_id.strip().lower()
-        project = db.eclipse_grad_forecast.find_one({'project_id': normalized_project_id}, {'forecast': 1, 'project_name': 1, '_id': 0})
+        project = db.eclipse_grad_forecast.find_one({'project_id': normalized_project_id}, {'forecast': 1, 'project_name': 1, 'data_version': 1, 'last_modified': 1, '_id': 0})
         if not project or 'forecast' not in project:
             return jsonify({'error': f"Project '{project_id}' not found."}), 404
 
@@ -809,6 +1005,11 @@ def get_eclipse_predictions_api(project_id, month):
         if month_str not in forecast:
             return jsonify({'error': f"Forecast data for month '{month}' not found for project '{project_id}'."}), 404
 
+        validators = document_validators(project)
+        unchanged = not_modified(validators)
+        if unchanged:
+            return unchanged
+
         current_close = forecast[month_str]['close']
 
         # Determine adjustment factor (reduced from 5% to 3%)
@@ -834,11 +1035,11 @@ def get_eclipse_predictions_api(project_id, month):
                 logger.warning(f"Forecast data for month '{next_month}' is missing for project '{project_id}'.")
                 continue
 
-        return jsonify({
+        return add_validators(jsonify({
             'project_id': project_id,
             'month': month,
             'adjusted_forecast': adjusted_forecast
-        }), 200
+        }), validators), 200
 
     except Exception as e:
         logger.error(f"Error fetching predictions for project '{project_id}', month '{month}': {e}")
@@ -849,7 +1050,7 @@ def get_eclipse_predictions_api(project_id, month):
 @cross_origin(origin='*')
 def upload_git_link():
     """
-    Receives a .git link from the frontend and triggers the pipeline.
+    Receives a .git link from the frontend and queues the pipeline; poll the returned status_url for progress.
     """
     try:
         data = request.get_json()
@@ -860,8 +1061,49 @@ def upload_git_link():
             return jsonify({'error': 'Provided URL is not a valid .git link.'}), 400
 
         logging.info(f"Received .git link: {git_link}")
-        pipeline_result = run_pipeline(git_link)
-        return jsonify(pipeline_result), 200
+        force = bool(data.get('force', False))
+        job, created = submit_pipeline_job(git_link, force=force)
+        status_url = url_for('main_routes.get_pipeline_job', job_id=job['job_id'])
+        response = jsonify({**public_job(job), 'status_url': status_url, 'created': created})
+        response.headers['Location'] = status_url
+        return response, 202
+    except JobQueueFull as e:
+        logging.warning(f"Rejected git link {git_link}: {e}")
+        response = jsonify({'error': 'Too many pipeline jobs are pending, please retry later.'})
+        response.headers['Retry-After'] = '60'
+        return response, 503
     except Exception as e:
         logging.error(f"Error processing git link: {e}")
+        return jsonify({'error': 'Internal server error.'}), 500
+
+@main_routes.route('/api/jobs/<job_id>', methods=['GET'])
+@cross_origin(origin='*')
+def get_pipeline_job(job_id):
+    """
+    Status of a pipeline job: overall status, per-stage progress and, once finished, the pipeline result.
+    """
+    try:
+        job = get_job(job_id)
+        if not job:
+            return jsonify({'error': f'No job found with id {job_id}.'}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        logging.error(f"Error fetching job {job_id}: {e}")
+        return jsonify({'error': 'Internal server error.'}), 500
+
+@main_routes.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+@cross_origin(origin='*')
+def cancel_pipeline_job(job_id):
+    """
+    Cancels a queued or running pipeline job. The running stage is stopped (the miner within seconds).
+    """
+    try:
+        job = cancel_job(job_id)
+        if not job:
+            return jsonify({'error': f'No job found with id {job_id}.'}), 404
+        if job['status'] in FINISHED_STATUSES:
+            return jsonify({'error': f"Job {job_id} has already finished ({job['status']})."}), 409
+        return jsonify({'job_id': job_id, 'cancel_requested': True}), 202
+    except Exception as e:
+        logging.error(f"Error cancelling job {job_id}: {e}")
         return jsonify({'error': 'Internal server error.'}), 500
\ No newline at end of file
@@ -8,18 +8,16 @@ import logging
 import time
 from itertools import cycle
 from app.config import Config
+from app.database import db
 from bs4 import BeautifulSoup
 import difflib
-from pymongo import MongoClient
+from app.utils.versioning import stamp_version
+from app.services.month_cache import ALL_PROJECTS, record_invalidation
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize MongoDB client
-mongo_client = MongoClient(Config.MONGODB_URI)
-db = mongo_client[Config.MONGODB_DB_NAME]
-
 # Fetch all repositories from the Apache GitHub organization and store them in MongoDB
 def fetch_apache_repositories_from_github():
     logging.info("Fetching Apache repositories from GitHub...")
@@ -108,7 +106,8 @@ def fetch_apache_repositories_from_github():
     if repos:
         try:
             db.github_repositories.drop()
-            db.github_repositories.insert_many(repos)
+            db.github_repositories.insert_many([stamp_version(repo) for repo in repos])
+            record_invalidation(db, 'github_repositories', ALL_PROJECTS)
             logging.info("Repositories data saved to MongoDB collection 'github_repositories'.")
         except Exception as e:
             logging.error(f"Error saving repositories to MongoDB: {e}")
@@ -149,7 +148,8 @@ def fetch_all_podlings():
     if all_projects:
         try:
             db.apache_projects.drop()
-            db.apache_projects.insert_many(all_projects)
+            db.apache_projects.insert_many([stamp_version(project) for project in all_projects])
+            record_invalidation(db, 'apache_projects', ALL_PROJECTS)
             logging.info("Apache projects data saved to MongoDB collection 'apache_projects'.")
         except Exception as e:
             logger.error(f"Error saving Apache projects to MongoDB: {e}")
@@ -1,12 +1,10 @@
 import requests
 import logging
 from app.config import Config
+from app.database import db
 from itertools import cycle
-from pymongo import MongoClient
-
-# Initialize MongoDB client
-mongo_client = MongoClient(Config.MONGODB_URI)
-db = mongo_client[Config.MONGODB_DB_NAME]
+from app.utils.versioning import stamp_version
+from app.services.month_cache import ALL_PROJECTS, record_invalidation
 
 def fetch_repos_service():
     try:
@@ -57,7 +55,8 @@ def fetch_repos_service():
         if all_repos:
             try:
                 db.github_repositories.drop()
-                db.github_repositories.insert_many(all_repos)
+                db.github_repositories.insert_many([stamp_version(repo) for repo in all_repos])
+                record_invalidation(db, 'github_repositories', ALL_PROJECTS)
                 logging.info("Repositories data saved to MongoDB collection 'github_repositories'.")
             except Exception as e:
                 logging.error(f"Error saving repositories to MongoDB: {e}")
@@ -0,0 +1,184 @@
+import logging
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from app.config import Config
+from app.services.month_cache import INVALIDATIONS_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+
+def _project_id_index(unique=True):
+    name = 'project_id_unique' if unique else 'project_id'
+    return IndexModel([('project_id', ASCENDING)], unique=unique, name=name)
+
+
+def _project_month_index():
+    return IndexModel([('project_id', ASCENDING), ('month', ASCENDING)], unique=True, name='project_id_month_unique')
+
+
+# Every index the API relies on, by collection.
+# Collections written with per-project upserts get a unique project_id index; the listing collections
+# (reloaded wholesale with insert_many) and commit_data (one document per fetch) get a plain one.
+DECLARED_INDEXES = {
+    'tech_net': [_project_id_index()],
+    'social_net': [_project_id_index()],
+    'commit_links': [_project_id_index()],
+    'email_links': [_project_id_index()],
+    'commit_measure': [_project_id_index()],
+    'email_measure': [_project_id_index()],
+    'grad_forecast': [_project_id_index()],
+    'monthly_ranges': [_project_id_index()],
+    'eclipse_tech_net': [_project_id_index()],
+    'eclipse_social_net': [_project_id_index()],
+    'eclipse_commit_links': [_project_id_index()],
+    'eclipse_email_links': [_project_id_index()],
+    'eclipse_commit_measure': [_project_id_index()],
+    'eclipse_email_measure': [_project_id_index()],
+    'eclipse_issue_measure': [_project_id_index()],
+    'eclipse_grad_forecast': [_project_id_index()],
+    # One document per (project_id, month index)
+    'local_commit_links': [_project_month_index()],
+    'local_issue_links': [_project_month_index()],
+    'local_tech_net': [_project_id_index()],
+    'local_social_net': [_project_id_index()],
+    'apache_projects': [_project_id_index(unique=False)],
+    'project_info': [_project_id_index(unique=False)],
+    'eclipse_project_info': [_project_id_index(unique=False)],
+    'commit_data': [IndexModel([('repo_name', ASCENDING)], name='repo_name')],
+    'pipeline_watermarks': [_project_id_index()],
+    'pipeline_artifacts': [_project_id_index()],
+    'local_reacts': [_project_month_index()],
+    'pipeline_jobs': [
+        IndexModel([('job_id', ASCENDING)], unique=True, name='job_id_unique'),
+        # At most one queued/running job per project (the field is removed when the job finishes)
+        IndexModel([('active_project_id', ASCENDING)], unique=True, sparse=True, name='active_project_id_unique'),
+    ],
+    'pipeline_results': [
+        IndexModel([('project_id', ASCENDING), ('head_sha', ASCENDING), ('tasks', ASCENDING),
+                    ('month_range', ASCENDING)], unique=True, name='project_id_head_sha_unique'),
+        IndexModel([('created_at', ASCENDING)], expireAfterSeconds=Config.PIPELINE_RESULT_TTL_SECONDS,
+                   name='created_at_ttl'),
+    ],
+    INVALIDATIONS_COLLECTION: [
+        IndexModel([('collection', ASCENDING), ('project_id', ASCENDING)], unique=True,
+                   name='collection_project_id_unique'),
+    ],
+}
+
+# Indexes of an earlier layout that would reject documents of the current one; ensure_indexes drops them.
+# local_*_links held a single document per project before they were split into month documents.
+RETIRED_INDEXES = {
+    'local_commit_links': ['project_id_unique'],
+    'local_issue_links': ['project_id_unique'],
+}
+
+
+class IndexCheckError(RuntimeError):
+    """Raised in strict mode when a declared index is missing and could not be created."""
+
+
+def _index_key(spec):
+    # The server may report directions as floats (1.0)
+    return tuple((field, direction if isinstance(direction, str) else int(direction)) for field, direction in spec)
+
+
+def _unused_indexes(collection):
+    """Names of indexes that have not served a single operation since the server started."""
+    try:
+        return sorted(
+            stat['name'] for stat in collection.aggregate([{'$indexStats': {}}])
+            if stat['name'] != '_id_' and stat.get('accesses', {}).get('ops', 0) == 0
+        )
+    except Exception as e:
+        # $indexStats needs the clusterMonitor role (and is not available on every deployment)
+        logger.debug(f"Could not read index usage for '{collection.name}': {e}")
+        return None
+
+
+def ensure_indexes(db, strict=False):
+    """
+    Create any declared index that is missing and report on the indexes of each collection.
+
+    Returns {collection: {'created', 'dropped', 'failed', 'undeclared', 'unused'}}, where 'dropped' lists the
+    RETIRED_INDEXES that were removed. An index that cannot be built or dropped
+    (typically a unique index over duplicate project_ids) is logged and reported under 'failed';
+    with strict=True an IndexCheckError is raised instead, so a deployment does not start without its indexes.
+    """
+    report = {}
+    for collection_name, models in DECLARED_INDEXES.items():
+        collection = db[collection_name]
+        entry = {'created': [], 'dropped': [], 'failed': [], 'undeclared': [], 'unused': None}
+        indexes = collection.index_information()
+        for name in RETIRED_INDEXES.get(collection_name, []):
+            if name not in indexes:
+                continue
+            try:
+                collection.drop_index(name)
+                del indexes[name]
+                entry['dropped'].append(name)
+                logger.info(f"Dropped retired index '{name}' on '{collection_name}'.")
+            except OperationFailure as e:
+                entry['failed'].append(name)
+                logger.error(f"Could not drop index '{name}' on '{collection_name}': {e}")
+        existing = {_index_key(info['key']): name for name, info in indexes.items()}
+        declared_keys = set()
+
+        for model in models:
+            document = model.document
+            key = _index_key(document['key'].items())
+            declared_keys.add(key)
+            if key in existing:
+                continue
+            try:
+                collection.create_indexes([model])
+                entry['created'].append(document['name'])
+                logger.info(f"Created index '{document['name']}' on '{collection_name}'.")
+            except OperationFailure as e:
+                entry['failed'].append(document['name'])
+                logger.error(f"Could not create index '{document['name']}' on '{collection_name}': {e}")
+
+        entry['undeclared'] = sorted(name for key, name in existing.items()
+                                     if name != '_id_' and key not in declared_keys)
+        entry['unused'] = _unused_indexes(collection)
+        if entry['undeclared']:
+            logger.warning(f"Undeclared indexes on '{collection_name}': {entry['undeclared']}")
+        if entry['unused']:
+            logger.warning(f"Unused indexes on '{collection_name}': {entry['unused']}")
+        report[collection_name] = entry
+
+    failed = {name: entry['failed'] for name, entry in report.items() if entry['failed']}
+    if failed and strict:
+        raise IndexCheckError(f"Missing indexes that could not be created: {failed}")
+    return report
+
+
+def init_indexes(app, ensure=True):
+    """
+    Register `flask ensure-indexes` and, unless ensure is false, ensure the declared indexes now
+    (MONGODB_ENSURE_INDEXES).
+    """
+    import click
+    from app.database import db
+
+    @app.cli.command('ensure-indexes')
+    @click.option('--strict', is_flag=True, help='Exit with an error if a declared index cannot be created.')
+    def ensure_indexes_command(strict):
+        """Create missing MongoDB indexes and report undeclared or unused ones."""
+        try:
+            report = ensure_indexes(db, strict=strict)
+        except IndexCheckError as e:
+            raise click.ClickException(str(e))
+        for collection_name, entry in report.items():
+            if entry['created'] or entry['dropped'] or entry['failed'] or entry['undeclared'] or entry['unused']:
+                click.echo(f"{collection_name}: {entry}")
+        click.echo(f"Checked indexes on {len(report)} collections.")
+
+    if not ensure or not app.config.get('MONGODB_ENSURE_INDEXES', True):
+        return
+    strict = app.config.get('MONGODB_INDEXES_STRICT', False)
+    try:
+        ensure_indexes(db, strict=strict)
+    except Exception as e:
+        if strict:
+            raise
+        logger.error(f"Error ensuring MongoDB indexes: {e}")
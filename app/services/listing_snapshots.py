@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import threading
+import time
+from flask import current_app
+from app.config import Config
+from app.services.month_cache import add_invalidation_listener, poll_invalidations
+from app.utils.compression import compress, negotiate_encoding
+from app.utils.http_cache import add_validators, not_modified
+from app.utils.sanitize import sanitize_document
+
+logger = logging.getLogger(__name__)
+
+
+class ListingSnapshot:
+    """
+    A whole collection, sanitised and serialised once as {"<key>": [documents]}.
+    Compressed variants are produced lazily and kept alongside the raw body.
+    """
+
+    def __init__(self, collection_name, key, body, last_modified):
+        self.collection_name = collection_name
+        self.key = key
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.last_modified = last_modified
+        self.built_at = time.monotonic()
+        self._encoded = {}
+
+    def encoded(self, encoding):
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compress(self.body, encoding, current_app)
+        return self._encoded[encoding]
+
+
+_snapshots = {}
+_stale = set()
+_lock = threading.Lock()
+
+
+def _mark_stale(collection_name, project_id):
+    if collection_name is None:
+        _stale.update(_snapshots)
+    else:
+        _stale.update(key for key in _snapshots if key[0] == collection_name)
+
+
+add_invalidation_listener(_mark_stale)
+
+
+def _build(db, collection_name, key):
+    start = time.perf_counter()
+    docs = []
+    last_modified = None
+    for doc in db[collection_name].find({}, {'_id': 0, 'data_version': 0}):
+        modified = doc.pop('last_modified', None)
+        if modified and (last_modified is None or modified > last_modified):
+            last_modified = modified
+        docs.append(sanitize_document(doc))
+    body = current_app.json.dumps({key: docs}).encode('utf-8')
+    logger.info(f"Built '{collection_name}' listing snapshot: {len(docs)} documents, {len(body)} bytes "
+                f"in {(time.perf_counter() - start) * 1000:.1f} ms.")
+    return ListingSnapshot(collection_name, key, body, last_modified)
+
+
+def get_snapshot(db, collection_name, key):
+    """Return the current snapshot of a listing, rebuilding it if the collection changed or it is too old."""
+    poll_invalidations(db)
+    snapshot_key = (collection_name, key)
+    snapshot = _snapshots.get(snapshot_key)
+    if snapshot is not None and snapshot_key not in _stale \
+            and time.monotonic() - snapshot.built_at < Config.LISTING_SNAPSHOT_MAX_AGE_SECONDS:
+        return snapshot
+
+    with _lock:
+        # Another request may have rebuilt it while we waited for the lock
+        snapshot = _snapshots.get(snapshot_key)
+        if snapshot is None or snapshot_key in _stale \
+                or time.monotonic() - snapshot.built_at >= Config.LISTING_SNAPSHOT_MAX_AGE_SECONDS:
+            _stale.discard(snapshot_key)
+            snapshot = _build(db, collection_name, key)
+            _snapshots[snapshot_key] = snapshot
+    return snapshot
+
+
+def serve_snapshot(db, collection_name, key):
+    """
+    Serve a listing endpoint straight from its snapshot: answers conditional requests with 304
+    and reuses the pre-compressed body for the negotiated encoding.
+    """
+    snapshot = get_snapshot(db, collection_name, key)
+    validators = (snapshot.etag, snapshot.last_modified)
+    unchanged = not_modified(validators)
+    if unchanged:
+        return unchanged
+
+    encoding = None
+    if current_app.config.get('COMPRESSION_ENABLED', True) \
+            and len(snapshot.body) >= current_app.config.get('COMPRESSION_MIN_SIZE', 1024):
+        encoding = negotiate_encoding(current_app)
+
+    body = snapshot.encoded(encoding) if encoding else snapshot.body
+    response = current_app.response_class(body, mimetype='application/json')
+    add_validators(response, validators)
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+        response.set_etag(snapshot.etag, weak=True)
+    return response
+
+
+def snapshot_stats():
+    return {
+        f'{collection_name}/{key}': {
+            'bytes': len(snapshot.body),
+            'age_seconds': round(time.monotonic() - snapshot.built_at, 1),
+            'stale': (collection_name, key) in _stale,
+            'encodings': sorted(snapshot._encoded),
+        }
+        for (collection_name, key), snapshot in list(_snapshots.items())
+    }
@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from app.config import Config
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Collection used to broadcast "project X in collection Y was rewritten" between processes.
+# The Mongo workers and the pipeline write to it; every web process polls it.
+INVALIDATIONS_COLLECTION = 'cache_invalidations'
+# project_id recorded when a whole collection was rewritten (drop + insert_many)
+ALL_PROJECTS = '*'
+
+# Shared cache for the per-project, per-month read endpoints, keyed by (collection, project_id, month)
+month_cache = TTLCache(maxsize=Config.MONTH_CACHE_MAX_ENTRIES, ttl=Config.MONTH_CACHE_TTL_SECONDS)
+
+_poll_lock = threading.Lock()
+_last_poll = 0.0
+_last_seen = datetime.utcnow()
+_applied = {}
+# Callbacks notified with (collection_name, project_id) on every invalidation, e.g. the listing snapshots
+_listeners = []
+
+
+def add_invalidation_listener(callback):
+    """Register callback(collection_name, project_id), called whenever a project is invalidated."""
+    _listeners.append(callback)
+
+
+def invalidate_project(project_id, collection_name=None):
+    """
+    Drop every cached month for project_id (optionally only for one collection).
+    ALL_PROJECTS drops every project of the collection.
+    """
+    dropped = month_cache.invalidate_where(
+        lambda key: project_id in (ALL_PROJECTS, key[1]) and (collection_name is None or key[0] == collection_name)
+    )
+    if dropped:
+        logger.info(f"Invalidated {dropped} cached month(s) for project_id '{project_id}'.")
+    for callback in _listeners:
+        callback(collection_name, project_id)
+    return dropped
+
+
+def record_invalidation(db, collection_name, project_id):
+    """
+    Drop the local cache entries for a rewritten project and tell the other processes to do the same.
+    Call this after every write that replaces a project's document.
+    """
+    invalidate_project(project_id, collection_name)
+    try:
+        db[INVALIDATIONS_COLLECTION].update_one(
+            {'collection': collection_name, 'project_id': project_id},
+            {'$set': {'invalidated_at': datetime.utcnow()}},
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Failed to record cache invalidation for '{collection_name}/{project_id}': {e}")
+
+
+def poll_invalidations(db, force=False):
+    """
+    Apply invalidations written by other processes since the last poll.
+    Runs at most once every CACHE_INVALIDATION_POLL_SECONDS, so the read path normally pays nothing.
+    """
+    global _last_poll, _last_seen
+
+    now = time.monotonic()
+    if not force and now - _last_poll < Config.CACHE_INVALIDATION_POLL_SECONDS:
+        return
+    if not _poll_lock.acquire(blocking=False):
+        return
+    try:
+        _last_poll = now
+        # Overlap the window a little so that small clock differences between writers do not lose events
+        since = _last_seen - timedelta(seconds=Config.CACHE_INVALIDATION_POLL_SECONDS)
+        events = list(db[INVALIDATIONS_COLLECTION].find(
+            {'invalidated_at': {'$gt': since}},
+            {'_id': 0, 'collection': 1, 'project_id': 1, 'invalidated_at': 1}
+        ))
+        for event in events:
+            event_key = (event.get('collection'), event.get('project_id'))
+            invalidated_at = event['invalidated_at']
+            if _applied.get(event_key) == invalidated_at:
+                continue
+            _applied[event_key] = invalidated_at
+            invalidate_project(event.get('project_id'), event.get('collection'))
+            if invalidated_at > _last_seen:
+                _last_seen = invalidated_at
+    except Exception as e:
+        logger.error(f"Failed to poll cache invalidations: {e}")
+    finally:
+        _poll_lock.release()
+
+
+def cache_stats():
+    return month_cache.stats()
@@ -1,12 +1,7 @@
 import re
 import math
 from datetime import datetime
-from pymongo import MongoClient
-from app.config import Config
-
-# Initialize MongoDB client
-mongo_client = MongoClient(Config.MONGODB_URI)
-db = mongo_client[Config.MONGODB_DB_NAME]
+from app.database import db
 
 def process_sankey_data_all(project_name):
     """
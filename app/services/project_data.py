@@ -0,0 +1,55 @@
+from app.services.month_cache import month_cache, poll_invalidations
+
+# Fields every month-wise endpoint needs besides the month itself (the version fields feed ETag/Last-Modified)
+BASE_PROJECTION = {'_id': 0, 'project_id': 1, 'project_name': 1, 'data_version': 1, 'last_modified': 1}
+
+
+def month_projection(months):
+    """Build a projection that only returns the given month keys of the 'months' map."""
+    projection = dict(BASE_PROJECTION)
+    for month in months:
+        projection[f'months.{month}'] = 1
+    return projection
+
+
+def find_project_month(db, collection_name, project_id, month):
+    """
+    Fetch a single month of a project, projecting 'months.<month>' in the query itself
+    so MongoDB never sends the rest of the multi-month document.
+    Returns None if the project does not exist; 'months' is missing or empty if the month does not.
+    """
+    return db[collection_name].find_one({'project_id': project_id}, month_projection([month]))
+
+
+def get_project_month(db, collection_name, project_id, month):
+    """
+    Return {'project_id', 'project_name', 'months': {month: data}} for one month of a project,
+    served from the month cache when possible. Returns None if the project does not exist.
+    """
+    poll_invalidations(db)
+
+    month_str = str(month)
+    key = (collection_name, project_id, month_str)
+    cached = month_cache.get(key)
+    if cached is not None:
+        return cached
+
+    project = find_project_month(db, collection_name, project_id, month_str)
+    if not project:
+        return None
+
+    project.setdefault('months', {})
+    month_cache.set(key, project)
+    return project
+
+
+def find_project_months(db, collection_name, project_id, months=None):
+    """
+    Fetch several months of a project in a single round trip.
+    When months is None the whole 'months' map is returned.
+    """
+    if months is None:
+        projection = dict(BASE_PROJECTION, months=1)
+    else:
+        projection = month_projection(months)
+    return db[collection_name].find_one({'project_id': project_id}, projection)
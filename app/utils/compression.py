@@ -0,0 +1,111 @@
+import gzip
+import zlib
+from flask import current_app, request
+
+try:
+    import cramjam  # provides brotli and zstd
+except ImportError:
+    cramjam = None
+
+# Mimetypes worth compressing; everything else (images, archives, ...) is passed through
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/javascript', 'text/html', 'text/plain', 'text/css', 'text/csv'}
+
+
+def _gzip(data, level):
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _brotli(data, level):
+    return bytes(cramjam.brotli.compress(data, level=level))
+
+
+def _zstd(data, level):
+    return bytes(cramjam.zstd.compress(data, level=level))
+
+
+ENCODERS = {'gzip': _gzip}
+if cramjam is not None:
+    ENCODERS['br'] = _brotli
+    ENCODERS['zstd'] = _zstd
+
+
+def available_encodings(app):
+    """Encodings enabled in COMPRESSION_ALGORITHMS that can actually be produced, in order of preference."""
+    configured = [name.strip() for name in app.config.get('COMPRESSION_ALGORITHMS', 'zstd,br,gzip').split(',')]
+    return [name for name in configured if name in ENCODERS]
+
+
+def negotiate_encoding(app, accept_encodings=None):
+    """Pick the preferred encoding the client accepts (q > 0), or None for identity."""
+    accept_encodings = request.accept_encodings if accept_encodings is None else accept_encodings
+    for name in available_encodings(app):
+        if accept_encodings[name] > 0:
+            return name
+    return None
+
+
+def compress(data, encoding, app):
+    level = app.config.get('COMPRESSION_LEVELS', {}).get(encoding)
+    if level is None:
+        level = {'gzip': 6, 'br': 4, 'zstd': 3}[encoding]
+    return ENCODERS[encoding](data, level)
+
+
+def _weaken_etag(response):
+    # A compressed body is a different representation, so a strong validator would be wrong
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+def _gzip_stream(chunks, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def compress_response(response):
+    """after_request hook compressing responses larger than COMPRESSION_MIN_SIZE."""
+    app = current_app
+    if not app.config.get('COMPRESSION_ENABLED', True):
+        return response
+    if request.method == 'HEAD' or response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(app)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        # Streamed bodies have no known size; only gzip is compressed incrementally
+        if 'gzip' not in available_encodings(app) or request.accept_encodings['gzip'] <= 0:
+            return response
+        response.response = _gzip_stream(response.response, app.config.get('COMPRESSION_LEVELS', {}).get('gzip', 6))
+        response.headers['Content-Encoding'] = 'gzip'
+        _weaken_etag(response)
+        return response
+
+    if response.content_length is not None and response.content_length < app.config.get('COMPRESSION_MIN_SIZE', 1024):
+        return response
+    body = response.get_data()
+    if len(body) < app.config.get('COMPRESSION_MIN_SIZE', 1024):
+        return response
+
+    response.set_data(compress(body, encoding, app))
+    response.headers['Content-Encoding'] = encoding
+    _weaken_etag(response)
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
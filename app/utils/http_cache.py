@@ -0,0 +1,49 @@
+import hashlib
+from flask import make_response, request
+from werkzeug.http import quote_etag
+
+# Projection for endpoints that return whole documents: hides the internal id and version fields
+PUBLIC_PROJECTION = {'_id': 0, 'data_version': 0, 'last_modified': 0}
+
+
+def document_validators(doc, *scope):
+    """
+    Build (etag, last_modified) for a response derived from one versioned document.
+    The scope (usually the request path) keeps ETags of different views of the same document apart.
+    Returns (None, None) for documents loaded before versioning existed.
+    """
+    version = doc.get('data_version') if doc else None
+    if not version:
+        return None, None
+    scope = scope or (request.path,)
+    etag = hashlib.sha1('|'.join([version, *map(str, scope)]).encode('utf-8')).hexdigest()
+    return etag, doc.get('last_modified')
+
+
+def not_modified(validators):
+    """
+    Return a 304 response if the request's If-None-Match / If-Modified-Since match the validators,
+    so the caller can skip building and serialising the body. Returns None otherwise.
+    """
+    etag, last_modified = validators
+    if etag is None:
+        return None
+    if request.if_none_match:
+        if not request.if_none_match.contains_weak(etag):
+            return None
+    elif not (last_modified and request.if_modified_since and last_modified <= request.if_modified_since.replace(tzinfo=None)):
+        return None
+    return add_validators(make_response('', 304), validators)
+
+
+def add_validators(response, validators):
+    """Attach ETag / Last-Modified headers to a response (a no-op for unversioned data)."""
+    etag, last_modified = validators
+    if etag is None:
+        return response
+    response.headers['ETag'] = quote_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    # Clients may reuse the response but must revalidate it first
+    response.headers.setdefault('Cache-Control', 'no-cache')
+    return response
@@ -0,0 +1,51 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to Flask's stdlib encoder
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson, registered in create_app when JSON_PROVIDER is 'orjson'.
+    Output matches Flask's default provider (sorted keys, HTTP dates for datetimes) except that
+    NaN/Infinity become null instead of invalid JSON. Falls back to the default provider for
+    calls with stdlib-only options or objects orjson cannot encode.
+    """
+
+    def _options(self, indent=False):
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj, indent=False):
+        return orjson.dumps(obj, default=self.default, option=self._options(indent))
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._encode(obj).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._encode(obj, indent) + b'\n'
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Install the JSON provider selected by the JSON_PROVIDER setting ('orjson' or 'default')."""
+    name = app.config.get('JSON_PROVIDER', 'orjson')
+    if name == 'orjson':
+        if orjson is None:
+            app.logger.warning("JSON_PROVIDER is 'orjson' but orjson is not installed; using the default provider.")
+            return
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,19 @@
+import math
+
+# This is to prevent any error occurring because of NaN value - this is converted to null
+def sanitize_document(doc):
+    """
+    Recursively sanitize the document by replacing NaN with None.
+    """
+    for key, value in doc.items():
+        if isinstance(value, float) and math.isnan(value):
+            doc[key] = None
+        elif isinstance(value, dict):
+            sanitize_document(value)
+        elif isinstance(value, list):
+            for idx, item in enumerate(value):
+                if isinstance(item, dict):
+                    sanitize_document(item)
+                elif isinstance(item, float) and math.isnan(item):
+                    value[idx] = None
+    return doc
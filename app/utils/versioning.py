@@ -0,0 +1,26 @@
+import hashlib
+import json
+from datetime import datetime
+
+# Fields written next to the data by stamp_version; they are excluded from the hash itself
+VERSION_FIELDS = ('data_version', 'last_modified')
+# Load timestamps stored with the data; excluded so that reloading identical data keeps the same version
+VOLATILE_FIELDS = ('last_updated', 'last_fetched')
+
+
+def content_version(doc):
+    """Return a stable hash of a document's content (ignoring _id and the version fields)."""
+    content = {k: v for k, v in doc.items() if k != '_id' and k not in VERSION_FIELDS + VOLATILE_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
+
+
+def stamp_version(doc):
+    """
+    Set 'data_version' (content hash) and 'last_modified' (load time) on a document before it is written.
+    The read endpoints use them as ETag / Last-Modified validators.
+    """
+    doc['data_version'] = content_version(doc)
+    # HTTP dates have a one-second resolution, so drop the microseconds to keep comparisons exact
+    doc['last_modified'] = datetime.utcnow().replace(microsecond=0)
+    return doc
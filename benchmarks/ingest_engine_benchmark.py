@@ -0,0 +1,75 @@
+"""
+Compares the two commit/issue ingest engines (scan_csv, row by row, and scan_csv_columnar, pandas) on
+synthetic miner CSVs, and checks that both produce the same month documents, earliest date and watermark.
+
+Usage (from the repository root):
+    python -m benchmarks.ingest_engine_benchmark [--rows 100000,1000000] [--iterations 3] [--dir /tmp]
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from app.pipeline.store_commit_issues import scan_csv, scan_csv_columnar, scan_months
+
+AUTHORS = [f"Developer {i}" for i in range(200)]
+
+
+def best_time(fn, iterations):
+    """Best-of-N wall time in seconds (least affected by noise), with the result of the last run."""
+    best, result = float('inf'), None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def write_csv(path, file_type, rows):
+    """A miner-like CSV with `rows` entries spread over ten years, in the miners' date format."""
+    rng = random.Random(rows)
+    start = datetime(2014, 1, 1)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        if file_type == 'commit':
+            writer.writerow(['project', 'commit_sha', 'commit_url', 'name', 'date'])
+        else:
+            writer.writerow(['repo_name', 'issue_url', 'user_name', 'created_at'])
+        for i in range(rows):
+            dt = start + timedelta(seconds=rng.randrange(10 * 365 * 86400))
+            if file_type == 'commit':
+                writer.writerow(['bench', f'{i:040x}', f'https://example.org/bench/commit/{i:040x}',
+                                 rng.choice(AUTHORS), dt.strftime('%Y-%m-%d %H:%M:%S UTC')])
+            else:
+                writer.writerow(['bench', f'https://example.org/bench/issues/{i}', rng.choice(AUTHORS),
+                                 dt.strftime('%Y-%m-%dT%H:%M:%SZ')])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='100000,1000000')
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--dir', default=tempfile.gettempdir())
+    args = parser.parse_args()
+
+    for rows in [int(n) for n in args.rows.split(',')]:
+        for file_type in ('commit', 'issue'):
+            path = os.path.join(args.dir, f'ingest-benchmark-{file_type}-{rows}.csv')
+            if not os.path.exists(path):
+                write_csv(path, file_type, rows)
+
+            python_seconds, python_scan = best_time(lambda: scan_csv(path), args.iterations)
+            pandas_seconds, pandas_scan = best_time(lambda: scan_csv_columnar(path), args.iterations)
+
+            earliest = python_scan['earliest']
+            assert pandas_scan['earliest'] == earliest, "earliest dates differ"
+            assert pandas_scan['watermark'] == python_scan['watermark'], "watermarks differ"
+            assert scan_months(pandas_scan, earliest) == scan_months(python_scan, earliest), "month documents differ"
+            print(f"{file_type:<6} rows={rows:<8} python={python_seconds:7.2f} s  pandas={pandas_seconds:7.2f} s  "
+                  f"speedup={python_seconds / pandas_seconds:5.2f}x  (identical output)")
+
+
+if __name__ == '__main__':
+    main()
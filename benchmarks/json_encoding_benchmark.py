@@ -0,0 +1,73 @@
+"""
+Compares Flask's default JSON encoder with the orjson provider, and the size of each
+payload under the negotiated compression algorithms, on the JSON fixtures in out/.
+
+Usage (from the repository root):
+    python -m benchmarks.json_encoding_benchmark [--iterations 20] [--path out]
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from flask import Flask
+from app.utils.compression import ENCODERS
+from app.utils.json_provider import OrjsonProvider, orjson
+
+LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+
+
+def best_time(fn, iterations):
+    """Best-of-N wall time in milliseconds (least affected by noise)."""
+    best = float('inf')
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path', default='out')
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_dumps = app.json.dumps
+    fast_dumps = OrjsonProvider(app).dumps if orjson is not None else None
+    if fast_dumps is None:
+        print("orjson is not installed; only the default encoder is measured.")
+
+    encodings = list(ENCODERS)
+    header = f"{'fixture':<55} {'raw':>10} {'default ms':>11} {'orjson ms':>10} " + ' '.join(f"{name:>9}" for name in encodings)
+    print(header)
+    print('-' * len(header))
+
+    totals = {'raw': 0, 'default': 0.0, 'orjson': 0.0, **{name: 0 for name in encodings}}
+    for path in sorted(glob.glob(os.path.join(args.path, '**', '*.json'), recursive=True)):
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        # Encode the way jsonify would: compact separators, sorted keys
+        body = default_dumps(payload, separators=(',', ':')).encode('utf-8')
+        default_ms = best_time(lambda: default_dumps(payload, separators=(',', ':')), args.iterations)
+        fast_ms = best_time(lambda: fast_dumps(payload), args.iterations) if fast_dumps else float('nan')
+        sizes = {name: len(ENCODERS[name](body, LEVELS[name])) for name in encodings}
+
+        totals['raw'] += len(body)
+        totals['default'] += default_ms
+        totals['orjson'] += fast_ms
+        for name in encodings:
+            totals[name] += sizes[name]
+        print(f"{os.path.relpath(path, args.path)[-55:]:<55} {len(body):>10,} {default_ms:>11.2f} {fast_ms:>10.2f} "
+              + ' '.join(f"{sizes[name]:>9,}" for name in encodings))
+
+    print('-' * len(header))
+    print(f"{'total':<55} {totals['raw']:>10,} {totals['default']:>11.2f} {totals['orjson']:>10.2f} "
+          + ' '.join(f"{totals[name]:>9,}" for name in encodings))
+    if totals['raw']:
+        print('compression ratio: ' + ', '.join(f"{name} {totals['raw'] / max(totals[name], 1):.1f}x" for name in encodings))
+
+
+if __name__ == '__main__':
+    main()
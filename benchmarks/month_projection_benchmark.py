@@ -0,0 +1,66 @@
+"""
+Compares fetching a whole multi-month project document against projecting a single
+'months.<month>' key, the way the month-wise endpoints now query MongoDB.
+
+Usage (from the repository root, with MONGODB_URI set):
+    python -m benchmarks.month_projection_benchmark --collection commit_links --project-id curator --month 12
+"""
+import argparse
+import statistics
+import time
+from pymongo import MongoClient
+from app.config import Config
+from app.services.project_data import month_projection
+
+
+def raw_bytes(collection, query, projection):
+    """Total BSON bytes MongoDB sends back for the query (measured on the raw batches)."""
+    return sum(len(batch) for batch in collection.find_raw_batches(query, projection, limit=1))
+
+
+def time_find_one(collection, query, projection, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        collection.find_one(query, projection)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(label, size, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) > 1 else timings[0]
+    print(f"{label:<12} bytes={size:>12,}  median={statistics.median(timings):8.2f} ms  p95={p95:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--collection', default='commit_links')
+    parser.add_argument('--project-id', required=True)
+    parser.add_argument('--month', default='1')
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    client = MongoClient(Config.MONGODB_URI)
+    collection = client[Config.MONGODB_DB_NAME][args.collection]
+    query = {'project_id': args.project_id.strip().lower()}
+    full_projection = {'_id': 0}
+    month_only = month_projection([args.month])
+
+    full_size = raw_bytes(collection, query, full_projection)
+    if not full_size:
+        print(f"Project '{args.project_id}' not found in '{args.collection}'.")
+        return
+    projected_size = raw_bytes(collection, query, month_only)
+
+    # Warm up the connection pool and the server cache before timing
+    time_find_one(collection, query, full_projection, 3)
+
+    print(f"{args.collection} / {args.project_id} / month {args.month} ({args.iterations} iterations)")
+    summarize('full', full_size, time_find_one(collection, query, full_projection, args.iterations))
+    summarize('projected', projected_size, time_find_one(collection, query, month_only, args.iterations))
+    print(f"bytes reduction: {100 * (1 - projected_size / full_size):.1f}%")
+
+
+if __name__ == '__main__':
+    main()
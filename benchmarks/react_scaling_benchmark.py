@@ -0,0 +1,54 @@
+"""
+Measures how run_react_all scales with the number of ReACT worker processes, on a
+project's net-caches feature CSV and the ReACT-API checkout in REACT_API_DIR.
+
+Usage (from the repository root):
+    python -m benchmarks.react_scaling_benchmark --feature-csv <net-caches CSV> [--workers 1,2,4,8] [--iterations 3]
+"""
+import argparse
+import os
+import time
+from app.pipeline import run_react
+from app.pipeline.stage_pool import StagePool
+
+
+def best_time(fn, iterations):
+    """Best-of-N wall time in seconds (least affected by noise)."""
+    best = float('inf')
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--feature-csv', required=True)
+    parser.add_argument('--workers', default=','.join(str(n) for n in (1, 2, 4, 8) if n <= (os.cpu_count() or 1)))
+    parser.add_argument('--iterations', type=int, default=3)
+    args = parser.parse_args()
+
+    feature_csv = os.path.abspath(args.feature_csv)
+    feature_path = run_react.prepare_features(feature_csv)
+    months = run_react.feature_months(feature_path)
+    print(f"{len(months)} months, features in {feature_path}, {os.cpu_count()} CPUs")
+
+    # Speedups are relative to the first worker count (1 by default)
+    baseline = None
+    for workers in [int(n) for n in args.workers.split(',')]:
+        pool = StagePool("ReACT", "REACT_API_DIR", max_workers=workers)
+        run_react.react_pool = pool
+        try:
+            # The first run starts the workers and fills their caches; only warm runs are timed
+            run_react.run_react_all(feature_csv)
+            seconds = best_time(lambda: run_react.run_react_all(feature_csv), args.iterations)
+        finally:
+            pool.shutdown()
+        baseline = baseline or seconds
+        print(f"workers={workers:<3} best={seconds:8.2f} s  months/s={len(months) / seconds:8.1f}  "
+              f"speedup={baseline / seconds:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import multiprocessing
+
+import pytest
+
+from app import create_app
+from app.config import Config
+from app.services import indexes
+
+
+@pytest.fixture
+def ensure_calls(monkeypatch):
+    calls = []
+
+    def ensure_indexes(db, strict=False):
+        calls.append(strict)
+        raise indexes.IndexCheckError("index build failed")
+
+    monkeypatch.setattr(indexes, "ensure_indexes", ensure_indexes)
+    monkeypatch.setattr(Config, "MONGODB_ENSURE_INDEXES", True)
+    monkeypatch.setattr(Config, "MONGODB_INDEXES_STRICT", True)
+    monkeypatch.delenv("PEX_GENERATOR_DIR", raising=False)
+    return calls
+
+
+def test_main_process_ensures_indexes(ensure_calls):
+    with pytest.raises(indexes.IndexCheckError):
+        create_app()
+    assert ensure_calls == [True]
+
+
+def test_pool_workers_skip_startup_side_effects(ensure_calls, monkeypatch):
+    # What a spawned pool worker sees when it re-imports run.py
+    monkeypatch.setattr(multiprocessing.current_process(), "name", "SpawnProcess-1")
+    app = create_app()
+    assert ensure_calls == []
+    assert "ensure-indexes" in app.cli.commands
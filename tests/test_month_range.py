@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from flask import Flask
+
+from app import routes
+from app.config import Config
+
+PROJECT = {'project_id': 'curator', 'project_name': 'Curator',
+           'months': {str(month): [{'sender': 'a', 'receiver': 'b', 'weight': month}] for month in range(1, 11)}}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    requested = []
+
+    def find_project_months(db, collection_name, project_id, months=None):
+        requested.append(months)
+        return PROJECT
+
+    monkeypatch.setattr(Config, 'MAX_MONTH_RANGE', 4)
+    monkeypatch.setattr(routes, 'find_project_months', find_project_months)
+    app = Flask(__name__)
+    app.register_blueprint(routes.main_routes)
+    client = app.test_client()
+    client.requested = requested
+    return client
+
+
+def get_range(client, query):
+    response = client.get(f'/api/tech_net/curator?{query}')
+    return response.status_code, json.loads(response.get_data(as_text=True))
+
+
+def test_open_ended_range_is_capped(client):
+    status, body = get_range(client, 'from=1')
+    assert status == 200
+    assert sorted(body['months'], key=int) == ['1', '2', '3', '4']
+    assert body['to'] == 4
+    assert list(client.requested[0]) == [1, 2, 3, 4]
+
+
+def test_open_ended_range_reports_the_last_month_returned(client):
+    status, body = get_range(client, 'from=9')
+    assert status == 200
+    assert sorted(body['months'], key=int) == ['9', '10']
+    assert body['to'] == 10
+
+
+def test_explicit_range_beyond_the_cap_is_rejected(client):
+    status, body = get_range(client, 'from=1&to=5')
+    assert status == 400
+    assert client.requested == []
+
+
+def test_explicit_range_within_the_cap(client):
+    status, body = get_range(client, 'from=2&to=3')
+    assert status == 200
+    assert sorted(body['months'], key=int) == ['2', '3']
+    assert body['to'] == 3
@@ -0,0 +1,58 @@
+import json
+import sys
+
+import pandas as pd
+import pytest
+
+from app.pipeline import run_react
+
+# Depends on every month up to the requested one, like an extractor that reads a project's history
+EXTRACTOR = '''
+def ReACT_Extractor(data, features, month):
+    history = features[features["month"] <= month]
+    return [{"ReACT_title": f"{data['name']} rows={len(history)} total={history['commits'].sum()}",
+             "Importance": int(month), "articles": [{"doi": "https://doi.org/10/x"}]}]
+'''
+
+
+@pytest.fixture
+def react_api_dir(tmp_path, monkeypatch):
+    package = tmp_path / "react_extractor"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "extractor.py").write_text(EXTRACTOR)
+    (package / "react_set.json").write_text(json.dumps({"name": "set"}))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "react_extractor", raising=False)
+    monkeypatch.delitem(sys.modules, "react_extractor.extractor", raising=False)
+    monkeypatch.setattr(run_react, "REACT_FEATURES_DIR", str(tmp_path / "features"))
+    run_react._feature_cache.clear()
+    run_react._react_set_cache.clear()
+    return tmp_path
+
+
+@pytest.fixture
+def feature_csv(tmp_path):
+    # One row per month, as in the net-caches CSVs
+    path = tmp_path / "project-cache.csv"
+    pd.DataFrame({"month": range(1, 13), "commits": [3 * m for m in range(1, 13)]}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_batched_and_single_month_paths_agree(react_api_dir, feature_csv):
+    feature_path = run_react.prepare_features(feature_csv)
+    last_month = max(run_react.feature_months(feature_path))
+    batched = run_react.react_months_in_worker(feature_path, [last_month - 1, last_month])
+    assert batched[last_month] == run_react.react_in_worker(feature_path)
+    assert batched[last_month - 1] != batched[last_month]
+
+
+def test_batches_see_the_whole_feature_matrix(react_api_dir, feature_csv):
+    feature_path = run_react.prepare_features(feature_csv)
+    in_batches = {}
+    for batch in run_react._month_batches(run_react.feature_months(feature_path), 3):
+        in_batches.update(run_react.react_months_in_worker(feature_path, batch))
+    at_once = run_react.react_months_in_worker(feature_csv, list(range(1, 13)))
+    assert in_batches == at_once
+    assert in_batches[5][0]["title"] == "set rows=5 total=45"
@@ -0,0 +1,45 @@
+import ast
+import os
+from datetime import datetime
+
+import pytest
+
+from app.utils.versioning import VOLATILE_FIELDS, content_version, stamp_version
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKERS = ["workers/apache_mongo_worker.py", "workers/eclipse_mongo_worker.py"]
+
+
+def stamped(**fields):
+    doc = {"project_id": "curator", "month": 3, "entries": [{"name": "a"}]}
+    doc.update(fields)
+    return stamp_version(doc)["data_version"]
+
+
+@pytest.mark.parametrize("field", VOLATILE_FIELDS)
+def test_load_timestamps_do_not_change_the_version(field):
+    assert stamped(**{field: datetime(2024, 1, 1)}) == stamped(**{field: datetime(2025, 6, 1)}) == stamped()
+
+
+def test_content_changes_the_version():
+    assert stamped(month=4) != stamped()
+
+
+def test_version_ignores_id_and_existing_version_fields():
+    doc = {"project_id": "curator", "month": 3}
+    assert content_version(dict(doc, _id="x", data_version="old", last_modified=datetime(2020, 1, 1))) \
+        == content_version(doc)
+
+
+@pytest.mark.parametrize("worker", WORKERS)
+def test_workers_stamp_with_the_shared_version(worker):
+    """Worker and API documents must hash alike, so the workers may not keep a copy of stamp_version."""
+    with open(os.path.join(REPO_ROOT, worker), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    local_definitions = [node.name for node in ast.walk(tree)
+                         if isinstance(node, ast.FunctionDef) and node.name in ("stamp_version", "content_version")]
+    shared_imports = [alias.name for node in ast.walk(tree)
+                      if isinstance(node, ast.ImportFrom) and node.module == "app.utils.versioning"
+                      for alias in node.names]
+    assert local_definitions == []
+    assert "stamp_version" in shared_imports
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+
+import bson
+import pytest
+
+from app.pipeline import watermarks
+from app.pipeline.store_commit_issues import get_month_index, scan_csv, scan_months
+
+
+class BsonCollection:
+    """Keeps one document and round-trips it through BSON, which turns aware datetimes into naive UTC like MongoDB."""
+
+    def __init__(self):
+        self.document = None
+
+    def update_one(self, query, update, upsert=False):
+        self.document = bson.decode(bson.encode(dict(query, **update["$set"])))
+
+    def find_one(self, query, projection=None):
+        return {k: v for k, v in self.document.items() if k != "_id"} if self.document else None
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = BsonCollection()
+    monkeypatch.setattr(watermarks, "db", {watermarks.WATERMARKS_COLLECTION: collection})
+    return collection
+
+
+def test_offset_earliest_date_keeps_its_month(collection, tmp_path):
+    csv_path = tmp_path / "commits.csv"
+    csv_path.write_text("project,commit_sha,commit_url,name,date\n"
+                        "curator,a,https://example.org/a,Ann,2020-03-01T00:30:00+0200\n"
+                        "curator,b,https://example.org/b,Bob,2020-04-15T12:00:00+0200\n")
+    scan = scan_csv(str(csv_path))
+    assert scan["earliest"] == datetime(2020, 3, 1, 0, 30, tzinfo=timezone(timedelta(hours=2)))
+
+    watermarks.save_watermark("curator", {"earliest_dt": scan["earliest"],
+                                          "commit": {"watermark": scan["watermark"]}})
+    stored = watermarks.get_watermark("curator")["earliest_dt"]
+
+    assert stored == datetime(2020, 3, 1, 0, 30)
+    assert get_month_index(2020, 3, stored) == 1
+    # An incremental run numbers the months like the full rebuild did
+    assert scan_months(scan, stored) == scan_months(scan, scan["earliest"])
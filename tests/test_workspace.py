@@ -0,0 +1,46 @@
+import os
+import time
+
+from app.pipeline.workspace import FINISHED_MARKER, Workspace, cleanup_workspaces
+
+DAY = 24 * 3600
+
+
+def make_run(root, run_id, finished, age, csv_age=None):
+    """A run directory last changed age seconds ago, with a miner CSV last written csv_age seconds ago."""
+    workspace = Workspace("curator", run_id, str(root)).create()
+    csv_path = os.path.join(workspace.output_dir, "curator-commits.csv")
+    open(csv_path, "w").close()
+    paths = [workspace.output_dir, workspace.run_dir]
+    if finished:
+        workspace.finish()
+        paths.append(os.path.join(workspace.run_dir, FINISHED_MARKER))
+    for path, seconds in [(path, age) for path in paths] + [(csv_path, age if csv_age is None else csv_age)]:
+        timestamp = time.time() - seconds
+        os.utime(path, (timestamp, timestamp))
+
+
+def remaining_runs(root):
+    return sorted(os.listdir(os.path.join(root, "curator", "runs")))
+
+
+def test_retention_only_removes_finished_runs(tmp_path):
+    make_run(tmp_path, "finished", True, 10 * DAY)
+    make_run(tmp_path, "mining", False, 10 * DAY, csv_age=60)
+    make_run(tmp_path, "idle", False, 10 * DAY)
+    assert cleanup_workspaces(root=tmp_path, retention_seconds=3 * DAY, stale_seconds=14 * DAY) == 1
+    assert remaining_runs(tmp_path) == ["idle", "mining"]
+
+
+def test_stale_unfinished_runs_are_removed(tmp_path):
+    make_run(tmp_path, "abandoned", False, 30 * DAY)
+    assert cleanup_workspaces(root=tmp_path, retention_seconds=3 * DAY, stale_seconds=14 * DAY) == 1
+    assert remaining_runs(tmp_path) == []
+
+
+def test_max_runs_keeps_the_newest_finished_runs(tmp_path):
+    for index, age in enumerate([300, 200, 100]):
+        make_run(tmp_path, f"run{index}", True, age)
+    make_run(tmp_path, "mining", False, 400)
+    assert cleanup_workspaces(root=tmp_path, max_runs=2, retention_seconds=DAY, stale_seconds=DAY) == 1
+    assert remaining_runs(tmp_path) == ["mining", "run1", "run2"]
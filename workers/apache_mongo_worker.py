@@ -2,6 +2,7 @@ import csv
 from datetime import datetime
 import json
 import os
+import sys
 import random
 import requests
 import logging
@@ -11,6 +12,10 @@ from bs4 import BeautifulSoup
 from pymongo import MongoClient
 import urllib.parse
 
+# The workers run as scripts from the repository root; the version hash is shared with the API
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.versioning import stamp_version
+
 class Config:
     REPOSITORIES = [
         "https://github.com/apache/curator.git",
@@ -59,6 +64,17 @@ logger = logging.getLogger(__name__)
 mongo_client = MongoClient(Config.MONGODB_URI)
 db = mongo_client[Config.MONGODB_DB_NAME]
 
+# Tell the running API processes to drop their cached copies of a rewritten project ('*' for a whole collection)
+def invalidate_cached_project(collection_name, project_id):
+    try:
+        db.cache_invalidations.update_one(
+            {'collection': collection_name, 'project_id': project_id},
+            {'$set': {'invalidated_at': datetime.utcnow()}},
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Failed to record cache invalidation for '{collection_name}/{project_id}': {e}")
+
 # This fetches all the data from Apache website
 def fetch_all_podlings():
     url = 'https://incubator.apache.org/projects/'
@@ -90,7 +106,8 @@ def fetch_all_podlings():
     if all_projects:
         try:
             db.apache_projects.drop()
-            db.apache_projects.insert_many(all_projects)
+            db.apache_projects.insert_many([stamp_version(project) for project in all_projects])
+            invalidate_cached_project('apache_projects', '*')
             logging.info("Apache projects data saved to MongoDB collection 'apache_projects'.")
         except Exception as e:
             logger.error(f"Error saving Apache projects to MongoDB: {e}")
@@ -303,11 +320,13 @@ def fetch_apache_repositories_from_github():
         try:
             # Use upsert to update existing repositories and insert new ones
             for repo in repos:
+                stamp_version(repo)
                 db.github_repositories.update_one(
                     {'name': repo['name']},
                     {'$set': repo},
                     upsert=True
                 )
+            invalidate_cached_project('github_repositories', '*')
             logging.info("Repositories data saved to MongoDB collection 'github_repositories'.")
         except Exception as e:
             logging.error(f"Error saving repositories to MongoDB: {e}")
@@ -455,12 +474,14 @@ def load_tech_net():
     for project_id, data in tech_net_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated tech_net data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update tech_net data for project_id '{project_id}': {e}")
 
@@ -529,12 +550,14 @@ def load_social_net():
     for project_id, data in social_net_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated social_net data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update social_net data for project_id '{project_id}': {e}")
 
@@ -614,12 +637,14 @@ def load_grad_forecast():
     for project_id, data in grad_forecast_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated grad_forecast data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update grad_forecast data for project_id '{project_id}': {e}")
 
@@ -688,12 +713,14 @@ def load_email_measure():
     for project_id, data in email_measure_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated email measure data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update email measure data for project_id '{project_id}': {e}")
 
@@ -762,12 +789,14 @@ def load_commit_measure():
     for project_id, data in email_measure_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated commit measure data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update commit measure data for project_id '{project_id}': {e}")
 
@@ -870,12 +899,14 @@ def load_commit_links_data():
     for project_id, data in commit_links_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated commit_links data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update commit_links data for project_id '{project_id}': {e}")
 
@@ -979,12 +1010,14 @@ def load_email_links_data():
     for project_id, data in email_links_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated email_links data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update email_links data for project_id '{project_id}': {e}")
 
@@ -1026,7 +1059,8 @@ def process_project_info():
     if projects:
         try:
             db.project_info.drop()
-            db.project_info.insert_many(projects.values())
+            db.project_info.insert_many([stamp_version(project) for project in projects.values()])
+            invalidate_cached_project('project_info', '*')
             logger.info("Project info data saved to MongoDB collection 'project_info'.")
         except Exception as e:
             logger.error(f"Error saving project info to MongoDB: {e}")
@@ -1103,12 +1137,14 @@ def load_project_info():
     for project_id, data in project_info_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated project_info data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update project_info data for project_id '{project_id}': {e}")
 
@@ -1146,11 +1182,13 @@ def process_monthly_ranges():
                 }
 
                 # Save the data to MongoDB
+                stamp_version(processed_data)
                 db.monthly_ranges.update_one(
                     {'project_id': project_id},
                     {'$set': processed_data},
                     upsert=True
                 )
+                invalidate_cached_project('monthly_ranges', project_id)
                 logger.info(f"Data for project '{project_id}' successfully saved to MongoDB.")
 
             except Exception as e:
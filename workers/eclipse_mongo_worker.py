@@ -1,10 +1,16 @@
 import csv
+from datetime import datetime
 import json
 import os
+import sys
 import logging
 from pymongo import MongoClient
 import urllib.parse
 
+# The workers run as scripts from the repository root; the version hash is shared with the API
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils.versioning import stamp_version
+
 class Config:
     REPOSITORIES = [
         "https://github.com/apache/curator.git",
@@ -50,6 +56,17 @@ logger = logging.getLogger(__name__)
 mongo_client = MongoClient(Config.MONGODB_URI)
 db = mongo_client[Config.MONGODB_DB_NAME]
 
+# Tell the running API processes to drop their cached copies of a rewritten project ('*' for a whole collection)
+def invalidate_cached_project(collection_name, project_id):
+    try:
+        db.cache_invalidations.update_one(
+            {'collection': collection_name, 'project_id': project_id},
+            {'$set': {'invalidated_at': datetime.utcnow()}},
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Failed to record cache invalidation for '{collection_name}/{project_id}': {e}")
+
 #################### 2024 Code for Eclipse loading to DB ###################
 
 # Helper function to load JSON file
@@ -214,7 +231,8 @@ def process_eclipse_project_info():
 
     if documents_to_insert:
         try:
-            db.eclipse_project_info.insert_many(documents_to_insert)
+            db.eclipse_project_info.insert_many([stamp_version(doc) for doc in documents_to_insert])
+            invalidate_cached_project('eclipse_project_info', '*')
             logger.info("Eclipse project info data saved to MongoDB collection 'eclipse_project_info'.")
         except Exception as e:
             logger.error(f"Error saving Eclipse project info to MongoDB: {e}")
@@ -274,12 +292,14 @@ def load_eclipse_tech_net():
     # Insert or update documents in MongoDB
     for project_id, data in tech_net_data.items():
         try:
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated tech_net data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update tech_net data for project_id '{project_id}': {e}")
 
@@ -340,12 +360,14 @@ def load_eclipse_social_net():
     # Insert or update documents in MongoDB
     for project_id, data in social_net_data.items():
         try:
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated social_net data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update social_net data for project_id '{project_id}': {e}")
 
@@ -419,12 +441,14 @@ def load_eclipse_grad_forecast():
     for project_id, data in grad_forecast_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated grad_forecast data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update grad_forecast data for project_id '{project_id}': {e}")
 
@@ -486,12 +510,14 @@ def load_eclipse_email_measure():
     for project_id, data in email_measure_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated email measure data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update email measure data for project_id '{project_id}': {e}")
 
@@ -554,12 +580,14 @@ def load_eclipse_commit_measure():
     for project_id, data in commit_measure_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated commit measure data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update commit measure data for project_id '{project_id}': {e}")
 
@@ -622,12 +650,14 @@ def load_eclipse_issues_measure():
     for project_id, data in issues_measure_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated issues measure data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update issues measure data for project_id '{project_id}': {e}")
 
@@ -731,12 +761,14 @@ def load_eclipse_email_links_data():
     for project_id, data in email_links_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated email_links data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update email_links data for project_id '{project_id}': {e}")
 
@@ -839,12 +871,14 @@ def load_commit_links_data():
     for project_id, data in commit_links_data.items():
         try:
             # Upsert the document: insert if it doesn't exist, update if it does
+            stamp_version(data)
             collection.update_one(
                 {'project_id': project_id},
                 {'$set': data},
                 upsert=True
             )
             logger.info(f"Inserted/Updated commit_links data for project_id '{project_id}'.")
+            invalidate_cached_project(collection.name, project_id)
         except Exception as e:
             logger.error(f"Failed to insert/update commit_links data for project_id '{project_id}': {e}")
 